@@ -66,6 +66,16 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'foodgram'),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.'
@@ -98,6 +108,35 @@ MEDIA_URL = "/dj_media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "dj_media")
 
 RECIPES_LIMIT = 6
+INGREDIENT_SEARCH_LIMIT = 20
+INGREDIENT_INDEX_TTL = 300
+RECIPE_SEARCH_CONFIG = 'russian'
+RECIPE_SEARCH_INDEX_TTL = 300
+RECIPE_SEARCH_BATCH_SIZE = 1000
+RECIPE_SEARCH_FALLBACK_LIMIT = 500
+PANTRY_INDEX_TTL = 300
+PANTRY_INGREDIENTS_LIMIT = 100
+BATCH_RECIPES_LIMIT = 100
+RECIPE_STATE_LIMIT = 100
+CATALOGUE_CACHE_TIMEOUT = 60 * 60
+RECIPE_CACHE_TIMEOUT = 60 * 60
+RECIPE_IMAGE_MAX_SIZE = 5 * 1024 * 1024
+RECIPE_THUMBNAIL_SIZE = (600, 600)
+RECIPE_THUMBNAIL_FORMAT = 'WEBP'
+RECIPE_THUMBNAIL_QUALITY = 80
+AUTH_TOKEN_CACHE_TTL = 5 * 60
+AUTH_TOKEN_LOCAL_CACHE_TTL = 10
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 1024
+FEED_STRATEGY = os.environ.get('FEED_STRATEGY', 'read')
+FEED_FANOUT_BATCH_SIZE = 1000
+FEED_BACKFILL_LIMIT = 100
+TASKS_BACKEND = os.environ.get('TASKS_BACKEND', 'thread')
+TASKS_WORKERS = 2
+SHOPPING_LIST_PDF_FONT = os.environ.get(
+    'SHOPPING_LIST_PDF_FONT',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+SHOPPING_LIST_PDF_MAX_ROWS = 1000
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
@@ -106,7 +145,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'],
@@ -1,6 +1,19 @@
+from collections import defaultdict
+
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
 
+from .images import create_thumbnail
 from .models import Recipe, Ingredient, Tag, ShoppingCart, Favorite
+from .services import (change_counter,
+                       remove_recipes,
+                       update_collection_bookkeeping
+                       )
+from .tasks import enqueue
+
+User = get_user_model()
 
 
 @admin.register(Recipe)
@@ -11,8 +24,52 @@ class RecipeAdmin(admin.ModelAdmin):
     readonly_fields = (
         'pub_date',
     )
+    list_display = (
+        'name', 'author', 'favorites_count', 'in_carts_count'
+    )
     empty_value_display = '-пусто-'
 
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        image_changed = 'image' in form.changed_data
+        if image_changed:
+            obj.thumbnail = ''
+        super().save_model(request, obj, form, change)
+        if not change:
+            change_counter(
+                User.objects.filter(pk=obj.author_id), 'recipes_count', 1
+            )
+        elif 'author' in form.changed_data:
+            change_counter(
+                User.objects.filter(pk=form.initial['author']),
+                'recipes_count', -1
+            )
+            change_counter(
+                User.objects.filter(pk=obj.author_id), 'recipes_count', 1
+            )
+        if image_changed:
+            enqueue(create_thumbnail, obj.pk)
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        author_id = obj.author_id
+        super().delete_model(request, obj)
+        change_counter(
+            User.objects.filter(pk=author_id), 'recipes_count', -1
+        )
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        deleted = list(
+            queryset.order_by().values('author').annotate(count=Count('pk'))
+        )
+        super().delete_queryset(request, queryset)
+        for row in deleted:
+            change_counter(
+                User.objects.filter(pk=row['author']),
+                'recipes_count', -row['count']
+            )
+
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
@@ -30,8 +87,7 @@ class TagAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-@admin.register(Favorite)
-class FavoriteAdmin(admin.ModelAdmin):
+class UserRecipeAdmin(admin.ModelAdmin):
     list_display = (
         'id', 'user', 'recipe', 'added_date'
     )
@@ -39,12 +95,34 @@ class FavoriteAdmin(admin.ModelAdmin):
         'user', 'recipe'
     )
 
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        update_collection_bookkeeping(
+            self.model, obj.user, [obj.recipe_id], 1
+        )
+
+    @transaction.atomic
+    def delete_model(self, request, obj):
+        remove_recipes(self.model, obj.user, [obj.recipe_id])
+
+    @transaction.atomic
+    def delete_queryset(self, request, queryset):
+        recipes = defaultdict(list)
+        for user_id, recipe_id in queryset.values_list('user', 'recipe'):
+            recipes[user_id].append(recipe_id)
+        for user in User.objects.filter(pk__in=recipes):
+            remove_recipes(self.model, user, recipes[user.pk])
+
+
+@admin.register(Favorite)
+class FavoriteAdmin(UserRecipeAdmin):
+    pass
+
 
 @admin.register(ShoppingCart)
-class ShoppingCartAdmin(admin.ModelAdmin):
-    list_display = (
-        'id', 'user', 'recipe', 'added_date'
-    )
-    search_fields = (
-        'user', 'recipe'
-    )
+class ShoppingCartAdmin(UserRecipeAdmin):
+    pass
@@ -0,0 +1,59 @@
+import bisect
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+
+from .indexes import InProcessIndex
+from .models import Ingredient
+
+
+class IngredientPrefixIndex(InProcessIndex):
+    ttl_setting = 'INGREDIENT_INDEX_TTL'
+
+    def build(self):
+        self._entries = sorted(
+            (name.lower(), pk)
+            for pk, name in Ingredient.objects.values_list('pk', 'name')
+        )
+
+    def search(self, query, limit):
+        query = query.lower()
+        self.ensure_loaded()
+        entries = self._entries
+        found = []
+        position = bisect.bisect_left(entries, (query,))
+        while (position < len(entries) and len(found) < limit
+               and entries[position][0].startswith(query)):
+            found.append(entries[position][1])
+            position += 1
+        if len(found) < limit:
+            prefixed = set(found)
+            for name, pk in entries:
+                if query in name and pk not in prefixed:
+                    found.append(pk)
+                    if len(found) == limit:
+                        break
+        return found
+
+
+ingredient_index = IngredientPrefixIndex()
+
+
+def search_ingredients(queryset, query, limit=None):
+    limit = limit or settings.INGREDIENT_SEARCH_LIMIT
+    if connection.vendor == 'postgresql':
+        return queryset.filter(name__icontains=query).annotate(
+            prefix_rank=Case(
+                When(name__istartswith=query, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        ).order_by('prefix_rank', 'name')[:limit]
+    found = ingredient_index.search(query, limit)
+    return queryset.filter(pk__in=found).order_by(
+        Case(
+            *[When(pk=pk, then=Value(rank)) for rank, pk in enumerate(found)],
+            output_field=IntegerField()
+        )
+    )
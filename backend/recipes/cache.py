@@ -0,0 +1,116 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+RECIPE_CATALOGUES = ('tags', 'ingredients')
+RECIPE_LIST_CATALOGUES = RECIPE_CATALOGUES + ('recipes',)
+RECIPE_VARIANTS = ('full', 'thumbnails')
+
+
+def new_version():
+    return time.time_ns(), int(time.time())
+
+
+def get_catalogue_version(name):
+    key = f'catalogue-version:{name}'
+    version = cache.get(key)
+    if version is None:
+        version = new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def invalidate_catalogue(name):
+    cache.set(f'catalogue-version:{name}', new_version(), None)
+
+
+def get_user_state_version(user):
+    return get_catalogue_version(f'user-state:{user.pk}')
+
+
+def invalidate_user_state(user_id):
+    invalidate_catalogue(f'user-state:{user_id}')
+
+
+def get_recipes_etag(request, *parts, catalogues=RECIPE_CATALOGUES):
+    versions = [get_catalogue_version(name) for name in catalogues]
+    if request.user.is_authenticated:
+        versions.append(get_user_state_version(request.user))
+    value = ':'.join(str(part) for part in (
+        request.accepted_renderer.format,
+        request.user.pk,
+        *parts,
+        *(version for version, last_modified in versions)
+    ))
+    return (
+        quote_etag(hashlib.md5(value.encode()).hexdigest()),
+        max(last_modified for version, last_modified in versions)
+    )
+
+
+def get_recipe_cache_keys(recipe_ids, variant):
+    version = '-'.join(
+        str(get_catalogue_version(name)[0])
+        for name in RECIPE_CATALOGUES
+    )
+    return {
+        recipe_id: f'recipe:{variant}:{version}:{recipe_id}'
+        for recipe_id in recipe_ids
+    }
+
+
+def invalidate_recipes(recipe_ids):
+    cache.delete_many([
+        key
+        for variant in RECIPE_VARIANTS
+        for key in get_recipe_cache_keys(recipe_ids, variant).values()
+    ])
+
+
+class CachedCatalogueMixin:
+    catalogue_name = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, action, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, JSONRenderer):
+            return action(request, *args, **kwargs)
+        version, last_modified = get_catalogue_version(self.catalogue_name)
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f'catalogue:{self.catalogue_name}:{version}:{path}'
+        cached = cache.get(key)
+        if cached is None:
+            response = action(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = renderer.render(
+                response.data,
+                request.accepted_media_type,
+                self.get_renderer_context()
+            )
+            cached = (body, quote_etag(hashlib.md5(body).hexdigest()))
+            cache.set(key, cached, settings.CATALOGUE_CACHE_TIMEOUT)
+        body, etag = cached
+        response = HttpResponse(body, content_type=renderer.media_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+            response=response
+        )
@@ -0,0 +1,82 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Follow, Recipe, TimelineEntry
+
+
+def timelines_enabled():
+    return settings.FEED_STRATEGY == 'write'
+
+
+def get_feed(user):
+    if timelines_enabled():
+        return Recipe.objects.filter(timeline_entries__user=user).order_by(
+            '-timeline_entries__pub_date', '-timeline_entries__recipe_id'
+        )
+    return Recipe.objects.filter(
+        author__in=Follow.objects.filter(user=user).values('author')
+    ).order_by('-pub_date', '-id')
+
+
+def fan_out_recipe(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).values(
+        'author_id', 'pub_date'
+    ).first()
+    if recipe is None:
+        return
+    followers = Follow.objects.filter(
+        author_id=recipe['author_id']
+    ).order_by('pk').values_list('user_id', flat=True).iterator(
+        chunk_size=settings.FEED_FANOUT_BATCH_SIZE
+    )
+    while True:
+        batch = list(islice(followers, settings.FEED_FANOUT_BATCH_SIZE))
+        if not batch:
+            break
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user_id=user_id,
+                    recipe_id=recipe_id,
+                    pub_date=recipe['pub_date']
+                )
+                for user_id in batch
+            ],
+            ignore_conflicts=True
+        )
+
+
+def add_author_to_timeline(user_id, author_id):
+    recipes = Recipe.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('pk', 'pub_date')[:settings.FEED_BACKFILL_LIMIT]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, recipe_id=pk, pub_date=pub_date)
+            for pk, pub_date in recipes
+        ],
+        ignore_conflicts=True
+    )
+
+
+def remove_author_from_timeline(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id,
+        recipe__author_id=author_id
+    ).delete()
+
+
+def rebuild_timelines():
+    TimelineEntry.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {TimelineEntry._meta.db_table} '
+            f'(user_id, recipe_id, pub_date) '
+            f'SELECT follow.user_id, recipe.id, recipe.pub_date '
+            f'FROM {Follow._meta.db_table} follow '
+            f'JOIN {Recipe._meta.db_table} recipe '
+            f'ON recipe.author_id = follow.author_id'
+        )
+        return cursor.rowcount
@@ -1,28 +1,48 @@
 import base64
-import imghdr
+import binascii
+import os
 import uuid
+from io import BytesIO
 
 import six
+from django.conf import settings
 from django.core.files.base import ContentFile
+from PIL import Image
 from rest_framework import serializers
 
 
 class Base64ImageField(serializers.ImageField):
+    default_error_messages = {
+        'max_size': 'Размер изображения не должен превышать {max_size} байт.',
+    }
+
     def to_internal_value(self, data):
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
         if isinstance(data, six.string_types):
             if 'data:' in data and ';base64,' in data:
-                header, data = data.split(';base64,')
+                header, data = data.split(';base64,', 1)
+            if len(data) > (max_size + 2) // 3 * 4:
+                self.fail('max_size', max_size=max_size)
             try:
-                decoded_file = base64.b64decode(data)
-            except TypeError:
+                decoded_file = base64.b64decode(data, validate=True)
+            except (TypeError, ValueError, binascii.Error):
                 self.fail('invalid_image')
             file_name = str(uuid.uuid4())[:12]
             file_extension = self.get_file_extension(file_name, decoded_file)
             complete_file_name = '%s.%s' % (file_name, file_extension,)
             data = ContentFile(decoded_file, name=complete_file_name)
+        elif getattr(data, 'size', None) is not None:
+            if data.size > max_size:
+                self.fail('max_size', max_size=max_size)
+            extension = os.path.splitext(data.name)[1].lower()
+            data.name = f'{str(uuid.uuid4())[:12]}{extension}'
         return super().to_internal_value(data)
 
     def get_file_extension(self, file_name, decoded_file):
-        extension = imghdr.what(file_name, decoded_file)
+        try:
+            with Image.open(BytesIO(decoded_file)) as image:
+                extension = image.format.lower()
+        except (OSError, ValueError):
+            self.fail('invalid_image')
         extension = 'jpg' if extension == 'jpeg' else extension
         return extension
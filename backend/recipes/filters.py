@@ -1,31 +1,72 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
 
-from .models import Recipe, Ingredient
+from .autocomplete import search_ingredients
+from .models import (
+    Favorite,
+    Ingredient,
+    ReceiptTag,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from .search import search_recipes
 
 
 class RecipeFilter(filters.FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='receipttag__tag__slug')
+    tags = filters.ModelMultipleChoiceFilter(
+        field_name='tags__slug',
+        to_field_name='slug',
+        queryset=Tag.objects.all(),
+        method='filter_tags'
+    )
     is_favorited = filters.BooleanFilter(method='get_favorite')
     is_in_shopping_cart = filters.BooleanFilter(method='get_in_shopping_cart')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Recipe
-        fields = ('is_favorited', 'is_in_shopping_cart', 'author', 'tags')
+        fields = (
+            'is_favorited', 'is_in_shopping_cart', 'author', 'tags', 'search'
+        )
+
+    def filter_tags(self, queryset, name, value):
+        if not value:
+            return queryset
+        return queryset.filter(Exists(ReceiptTag.objects.filter(
+            recipe=OuterRef('pk'),
+            tag__in=value
+        )))
+
+    def filter_search(self, queryset, name, value):
+        if not value.strip():
+            return queryset
+        return search_recipes(queryset, value)
+
+    def filter_user_relation(self, queryset, model, value):
+        if not value:
+            return queryset
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset.none()
+        return queryset.filter(Exists(model.objects.filter(
+            user=user,
+            recipe=OuterRef('pk')
+        )))
 
     def get_favorite(self, queryset, name, value):
-        if value:
-            return Recipe.objects.filter(favorites__user=self.request.user)
-        return Recipe.objects.all()
+        return self.filter_user_relation(queryset, Favorite, value)
 
     def get_in_shopping_cart(self, queryset, name, value):
-        if value:
-            return Recipe.objects.filter(shopping_cart__user=self.request.user)
-        return Recipe.objects.all()
+        return self.filter_user_relation(queryset, ShoppingCart, value)
 
 
 class IngredientFilter(filters.FilterSet):
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Ingredient
         fields = ('name',)
+
+    def filter_name(self, queryset, name, value):
+        return search_ingredients(queryset, value)
@@ -0,0 +1,66 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .cache import invalidate_recipes
+from .models import Recipe
+
+FORMAT_EXTENSIONS = {
+    'JPEG': 'jpg',
+    'WEBP': 'webp',
+}
+
+
+def get_thumbnail_format():
+    thumbnail_format = settings.RECIPE_THUMBNAIL_FORMAT.upper()
+    if thumbnail_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return thumbnail_format
+
+
+def render_thumbnail(source):
+    thumbnail_format = get_thumbnail_format()
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(settings.RECIPE_THUMBNAIL_SIZE)
+        if thumbnail_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        output = BytesIO()
+        image.save(
+            output,
+            thumbnail_format,
+            quality=settings.RECIPE_THUMBNAIL_QUALITY
+        )
+    return output.getvalue(), FORMAT_EXTENSIONS[thumbnail_format]
+
+
+def create_thumbnail(recipe_id):
+    recipe = Recipe.objects.filter(pk=recipe_id).only(
+        'image', 'thumbnail'
+    ).first()
+    if recipe is None or not recipe.image:
+        return
+    with recipe.image.open('rb') as source:
+        content, extension = render_thumbnail(source)
+    base_name = os.path.splitext(os.path.basename(recipe.image.name))[0]
+    field = recipe.thumbnail.field
+    storage = recipe.thumbnail.storage
+    previous = recipe.thumbnail.name
+    stored = storage.save(
+        field.generate_filename(recipe, f'{base_name}.{extension}'),
+        ContentFile(content)
+    )
+    updated = Recipe.objects.filter(
+        pk=recipe_id,
+        image=recipe.image.name
+    ).update(thumbnail=stored, updated_at=timezone.now())
+    if not updated:
+        storage.delete(stored)
+        return
+    invalidate_recipes([recipe_id])
+    if previous and previous != stored:
+        storage.delete(previous)
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+class InProcessIndex:
+    ttl_setting = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_at = None
+
+    def build(self):
+        raise NotImplementedError
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def is_loaded(self):
+        return self._built_at is not None
+
+    def is_fresh(self):
+        return self.is_loaded() and (
+            time.monotonic() - self._built_at
+            <= getattr(settings, self.ttl_setting)
+        )
+
+    def ensure_loaded(self):
+        if self.is_fresh():
+            return
+        with self._lock:
+            if self.is_fresh():
+                return
+            self.build()
+            self._built_at = time.monotonic()
+
+
+class IncrementalIndex(InProcessIndex):
+    def load_entries(self, keys):
+        raise NotImplementedError
+
+    def add_entry(self, key, entry):
+        raise NotImplementedError
+
+    def remove_entry(self, key):
+        raise NotImplementedError
+
+    def update(self, keys):
+        if not self.is_loaded():
+            return
+        entries = self.load_entries(keys)
+        with self._lock:
+            if not self.is_loaded():
+                return
+            for key in keys:
+                self.remove_entry(key)
+                if key in entries:
+                    self.add_entry(key, entries[key])
+
+    def remove(self, key):
+        with self._lock:
+            if self.is_loaded():
+                self.remove_entry(key)
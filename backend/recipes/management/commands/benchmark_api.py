@@ -0,0 +1,478 @@
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Favorite,
+    Follow,
+    Ingredient,
+    ReceiptTag,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Tag
+)
+from users.authentication import cache_token, invalidate_token
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+PANTRY_SIZE = 30
+BATCH_PAYLOAD_SIZE = 20
+STATE_SIZE = 50
+BENCHMARK_PASSWORD = 'benchmark'
+NEW_PASSWORD = 'Nov0e-Pa55word'
+BENCHMARK_IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAA'
+    'DUlEQVR42mP8z8DwHwAFBQIAX8jx0gAAAABJRU5ErkJggg=='
+)
+
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO')
+
+Endpoint = namedtuple('Endpoint', 'name method path budget data token')
+
+
+def endpoint(name, method, path, budget, data=None, token=None):
+    return Endpoint(name, method, path, budget, data, token)
+
+
+def recipe_payload(ctx, index):
+    return {
+        'name': f'Бенчмарк {index}',
+        'text': 'Рецепт, созданный бенчмарком',
+        'cooking_time': 10,
+        'image': BENCHMARK_IMAGE,
+        'tags': [tag.id for tag in ctx['tags'][:2]],
+        'ingredients': [
+            {'id': ingredient_id, 'amount': 100}
+            for ingredient_id in ctx['ingredient_ids'][:12]
+        ],
+    }
+
+
+def batch_payload(ctx, index):
+    return {'recipes': ctx['targets'][-BATCH_PAYLOAD_SIZE:]}
+
+
+def registration_payload(ctx, index):
+    return {
+        'email': f'newcomer{index}@example.com',
+        'username': f'newcomer{index}',
+        'first_name': 'Новый',
+        'last_name': 'Пользователь',
+        'password': NEW_PASSWORD,
+    }
+
+
+def login_payload(ctx, index):
+    return {'email': ctx['user'].email, 'password': BENCHMARK_PASSWORD}
+
+
+def password_payload(ctx, index):
+    return {
+        'current_password': BENCHMARK_PASSWORD,
+        'new_password': NEW_PASSWORD,
+    }
+
+
+def member_token(ctx, index):
+    return ctx['sessions'][index][0]
+
+
+# The token is cached as after a login, so budgets exclude the token
+# lookup. They also exclude the savepoints that appear only because the
+# benchmark runs in a transaction. Recipe read budgets cover pages whose
+# representations are not cached yet; user flags are read once per page
+# whatever the cache state, and cached recipes skip the recipe, tag and
+# ingredient queries. Recipe list and detail budgets include the ETag
+# query that answers revalidation requests on its own. Password change
+# and logout run as separate members so the main token stays valid.
+ENDPOINTS = (
+    endpoint('tags-list', 'get', '/api/tags/', 1),
+    endpoint('tags-detail', 'get', '/api/tags/{tag}/', 1),
+    endpoint('ingredients-list', 'get', '/api/ingredients/', 1),
+    endpoint('ingredients-search', 'get', '/api/ingredients/?name=мо', 2),
+    endpoint('ingredients-detail', 'get', '/api/ingredients/{ingredient}/', 1),
+    endpoint('recipes-list', 'get', '/api/recipes/?limit=50', 6),
+    endpoint(
+        'recipes-list-keyset', 'get',
+        '/api/recipes/?pagination=keyset&limit=50', 5
+    ),
+    endpoint(
+        'recipes-list-filtered', 'get',
+        '/api/recipes/?limit=50&is_favorited=1&tags={tag_slug}', 7
+    ),
+    endpoint(
+        'recipes-search', 'get',
+        '/api/recipes/?limit=50&search=рецепт бенчмарк', 5
+    ),
+    endpoint(
+        'recipes-pantry', 'get',
+        '/api/recipes/pantry/?limit=50&missing=3&{pantry}', 5
+    ),
+    endpoint('recipes-detail', 'get', '/api/recipes/{recipe}/', 4),
+    endpoint('recipes-state', 'get', '/api/recipes/state/?{state}', 2),
+    endpoint('recipes-feed', 'get', '/api/recipes/feed/?limit=50', 5),
+    endpoint('recipes-create', 'post', '/api/recipes/', 10, recipe_payload),
+    endpoint(
+        'recipes-update', 'patch', '/api/recipes/{own_recipe}/', 14,
+        recipe_payload
+    ),
+    endpoint('favorite-add', 'get', '/api/recipes/{target}/favorite/', 3),
+    endpoint(
+        'favorite-remove', 'delete', '/api/recipes/{target}/favorite/', 2
+    ),
+    endpoint(
+        'shopping-cart-add', 'get', '/api/recipes/{target}/shopping_cart/', 6
+    ),
+    endpoint(
+        'shopping-cart-remove', 'delete',
+        '/api/recipes/{target}/shopping_cart/', 5
+    ),
+    endpoint(
+        'favorite-batch-add', 'post', '/api/recipes/favorite/', 4,
+        batch_payload
+    ),
+    endpoint(
+        'favorite-batch-remove', 'delete', '/api/recipes/favorite/', 3,
+        batch_payload
+    ),
+    endpoint(
+        'shopping-cart-batch-add', 'post', '/api/recipes/shopping_cart/', 7,
+        batch_payload
+    ),
+    endpoint(
+        'shopping-cart-batch-remove', 'delete',
+        '/api/recipes/shopping_cart/', 6, batch_payload
+    ),
+    endpoint(
+        'download-shopping-cart', 'get',
+        '/api/recipes/download_shopping_cart/', 1
+    ),
+    endpoint(
+        'download-shopping-cart-pdf', 'get',
+        '/api/recipes/download_shopping_cart/?format=pdf', 1
+    ),
+    endpoint(
+        'subscriptions', 'get',
+        '/api/users/subscriptions/?limit=50&recipes_limit=3', 3
+    ),
+    endpoint('subscribe', 'get', '/api/users/{author}/subscribe/', 4),
+    endpoint('unsubscribe', 'delete', '/api/users/{author}/subscribe/', 1),
+    endpoint('users-list', 'get', '/api/users/', 2),
+    endpoint('users-me', 'get', '/api/users/me/', 1),
+    endpoint('users-detail', 'get', '/api/users/{author}/', 1),
+    endpoint('recipes-delete', 'delete', '/api/recipes/{own_recipe}/', 10),
+    endpoint(
+        'users-create', 'post', '/api/users/', 3, registration_payload
+    ),
+    endpoint(
+        'auth-login', 'post', '/api/auth/token/login/', 2, login_payload
+    ),
+    endpoint(
+        'set-password', 'post', '/api/users/set_password/', 3,
+        password_payload, member_token
+    ),
+    endpoint(
+        'auth-logout', 'post', '/api/auth/token/logout/', 2,
+        token=member_token
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу тестовыми данными внутри транзакции, обходит все '
+        'эндпоинты API и проверяет бюджеты запросов. Все изменения '
+        'откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--recipes', type=int, default=20000)
+        parser.add_argument('--follows', type=int, default=20)
+        parser.add_argument('--favorites', type=int, default=20)
+        parser.add_argument('--carts', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--ingredients',
+            default=os.path.join(
+                settings.BASE_DIR, '..', 'data', 'ingredients.csv'
+            )
+        )
+        parser.add_argument(
+            '--only', nargs='*', default=None,
+            help='Запустить только перечисленные эндпоинты.'
+        )
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        media_root = tempfile.mkdtemp()
+        try:
+            with override_settings(MEDIA_ROOT=media_root):
+                with transaction.atomic():
+                    started = time.perf_counter()
+                    ctx = self.seed(options)
+                    self.stdout.write(
+                        'Данные созданы за '
+                        f'{time.perf_counter() - started:.1f} с'
+                    )
+                    sessions = [(ctx['token'], ctx['user'])]
+                    sessions.extend(ctx['sessions'])
+                    for key, user in sessions:
+                        cache_token(key, user)
+                    try:
+                        results = self.run_endpoints(ctx, options)
+                    finally:
+                        for key, user in sessions:
+                            invalidate_token(key)
+                    transaction.set_rollback(True)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+        self.report(results)
+
+    def seed(self, options):
+        password = make_password(BENCHMARK_PASSWORD)
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f'benchmark{number}@example.com',
+                    username=f'benchmark{number}',
+                    password=password
+                )
+                for number in range(options['users'] + 1)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        if users[0].pk is None:
+            users = list(
+                User.objects.filter(username__startswith='benchmark')
+                .order_by('pk')
+            )
+        user, authors = users[0], users[1:]
+        members = User.objects.bulk_create([
+            User(
+                email=f'member{number}@example.com',
+                username=f'member{number}',
+                password=password
+            )
+            for number in range(options['repeat'])
+        ])
+        if members[0].pk is None:
+            members = list(
+                User.objects.filter(username__startswith='member')
+                .order_by('pk')
+            )
+
+        call_command(
+            'load_ingredients', options['ingredients'],
+            verbosity=0, stdout=self.stdout
+        )
+        ingredient_ids = list(Ingredient.objects.values_list('pk', flat=True))
+        tags = [
+            Tag.objects.create(
+                name=f'benchmark-{number}',
+                color='#49B64E',
+                slug=f'benchmark-{number}'
+            )
+            for number in range(3)
+        ]
+
+        recipes = Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    author=random.choice(authors),
+                    name=f'Рецепт {number}',
+                    text='Описание рецепта для бенчмарка',
+                    image='recipes/images/benchmark.png',
+                    cooking_time=random.randint(1, 120)
+                )
+                for number in range(options['recipes'])
+            ],
+            batch_size=BATCH_SIZE
+        )
+        if recipes[0].pk is None:
+            recipes = list(
+                Recipe.objects.filter(author__in=authors).order_by('pk')
+            )
+        recipe_ids = [recipe.pk for recipe in recipes]
+        RecipeIngredient.objects.bulk_create(
+            (
+                RecipeIngredient(
+                    recipe_id=recipe_id,
+                    ingredient_id=ingredient_id,
+                    amount=random.randint(1, 500)
+                )
+                for recipe_id in recipe_ids
+                for ingredient_id in random.sample(
+                    ingredient_ids, random.randint(5, 12)
+                )
+            ),
+            batch_size=BATCH_SIZE
+        )
+        ReceiptTag.objects.bulk_create(
+            (
+                ReceiptTag(recipe_id=recipe_id, tag=tag)
+                for recipe_id in recipe_ids
+                for tag in random.sample(tags, random.randint(1, 3))
+            ),
+            batch_size=BATCH_SIZE
+        )
+
+        for model, field, targets, per_user in (
+            (Follow, 'author', authors, options['follows']),
+            (Favorite, 'recipe', recipes, options['favorites']),
+            (ShoppingCart, 'recipe', recipes, options['carts']),
+        ):
+            model.objects.bulk_create(
+                (
+                    model(user=member, **{field: target})
+                    for member in users
+                    for target in random.sample(
+                        targets, min(per_user, len(targets))
+                    )
+                    if target != member
+                ),
+                batch_size=BATCH_SIZE,
+                ignore_conflicts=True
+            )
+
+        own_recipes = Recipe.objects.bulk_create([
+            Recipe(
+                author=user,
+                name=f'Свой рецепт {number}',
+                text='Рецепт пользователя бенчмарка',
+                image='recipes/images/benchmark.png',
+                cooking_time=15
+            )
+            for number in range(options['repeat'])
+        ])
+        if own_recipes[0].pk is None:
+            own_recipes = list(Recipe.objects.filter(author=user))
+        call_command('recalculate_counters', verbosity=0, stdout=self.stdout)
+        call_command('rebuild_cart_totals', verbosity=0, stdout=self.stdout)
+
+        followed = set(
+            Follow.objects.filter(user=user).values_list('author', flat=True)
+        )
+        kept = set(
+            Favorite.objects.filter(user=user).values_list('recipe', flat=True)
+        ) | set(
+            ShoppingCart.objects.filter(user=user)
+            .values_list('recipe', flat=True)
+        )
+        pantry = list(dict.fromkeys(
+            RecipeIngredient.objects.filter(recipe_id__in=recipe_ids[:5])
+            .order_by('recipe_id')
+            .values_list('ingredient_id', flat=True)
+        ))[:PANTRY_SIZE]
+        return {
+            'user': user,
+            'token': Token.objects.create(user=user).key,
+            'sessions': [
+                (Token.objects.create(user=member).key, member)
+                for member in members
+            ],
+            'pantry': pantry,
+            'tags': tags,
+            'ingredient_ids': ingredient_ids,
+            'recipes': recipe_ids,
+            'own_recipes': [recipe.pk for recipe in own_recipes],
+            'targets': [pk for pk in recipe_ids if pk not in kept],
+            'authors': [
+                author.pk for author in authors if author.pk not in followed
+            ],
+        }
+
+    def run_endpoints(self, ctx, options):
+        client = APIClient()
+        selected = options['only']
+        results = []
+        for item in ENDPOINTS:
+            if selected and item.name not in selected:
+                continue
+            timings, queries, size, status_code = [], 0, 0, None
+            for index in range(options['repeat']):
+                path = item.path.format(
+                    tag=ctx['tags'][0].pk,
+                    tag_slug=ctx['tags'][0].slug,
+                    ingredient=ctx['ingredient_ids'][index],
+                    recipe=ctx['recipes'][index],
+                    own_recipe=ctx['own_recipes'][index],
+                    target=ctx['targets'][index],
+                    author=ctx['authors'][index],
+                    state='&'.join(
+                        f'ids={pk}' for pk in ctx['recipes'][:STATE_SIZE]
+                    ),
+                    pantry='&'.join(
+                        f'ingredients={pk}'
+                        for pk in ctx['pantry']
+                    ),
+                )
+                data = item.data(ctx, index) if item.data else None
+                token = item.token(ctx, index) if item.token else ctx['token']
+                client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = getattr(client, item.method)(
+                        path, data, format='json'
+                    )
+                    if response.streaming:
+                        content = b''.join(response.streaming_content)
+                    else:
+                        content = response.content
+                    timings.append(time.perf_counter() - started)
+                queries = max(queries, sum(
+                    not query['sql'].startswith(TRANSACTION_STATEMENTS)
+                    for query in captured.captured_queries
+                ))
+                size = max(size, len(content))
+                status_code = response.status_code
+            results.append({
+                'endpoint': item,
+                'status': status_code,
+                'queries': queries,
+                'time': statistics.median(timings),
+                'size': size,
+            })
+        return results
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"эндпоинт":<28} {"код":>4} {"запросы":>9} {"мс":>9} '
+            f'{"байт":>9}'
+        )
+        failed = []
+        for result in results:
+            item = result['endpoint']
+            line = (
+                f'{item.name:<28} {result["status"]:>4} '
+                f'{result["queries"]:>4}/{item.budget:<4} '
+                f'{result["time"] * 1000:>9.1f} {result["size"]:>9}'
+            )
+            if result['queries'] > item.budget or result['status'] >= 400:
+                failed.append(item.name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if failed:
+            raise CommandError(
+                'Превышен бюджет запросов или запрос завершился ошибкой: '
+                + ', '.join(failed)
+            )
+        self.stdout.write(self.style.SUCCESS('Все бюджеты соблюдены.'))
@@ -0,0 +1,158 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.feed import fan_out_recipe, rebuild_timelines
+from recipes.models import Follow, Recipe
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+STRATEGIES = ('read', 'write')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стратегии ленты подписок (fan-out при чтении и при '
+        'записи) для разного числа подписчиков автора. Все изменения '
+        'откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--followers', type=int, nargs='+',
+            default=[10, 100, 1000, 10000]
+        )
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--following', type=int, default=20)
+        parser.add_argument('--recipes', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        self.stdout.write(
+            f'{"подписчиков":>11} {"стратегия":>9} {"сборка мс":>10} '
+            f'{"публикация мс":>14} {"чтение мс":>10} {"запросы":>8}'
+        )
+        for followers in options['followers']:
+            with transaction.atomic():
+                ctx = self.seed(followers, options)
+                for strategy in STRATEGIES:
+                    with override_settings(FEED_STRATEGY=strategy):
+                        self.report(
+                            followers, strategy,
+                            self.measure(ctx, strategy, options)
+                        )
+                transaction.set_rollback(True)
+
+    def seed(self, followers, options):
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f'feed{number}@example.com',
+                    username=f'feed{number}',
+                    password='!'
+                )
+                for number in range(options['authors'] + followers)
+            ],
+            batch_size=BATCH_SIZE
+        )
+        if users[0].pk is None:
+            users = list(
+                User.objects.filter(username__startswith='feed')
+                .order_by('pk')
+            )
+        authors = users[:options['authors']]
+        readers = users[options['authors']:]
+        Recipe.objects.bulk_create(
+            (
+                Recipe(
+                    author=author,
+                    name=f'Лента {number}',
+                    text='Рецепт для бенчмарка ленты',
+                    image='recipes/images/benchmark.png',
+                    cooking_time=10
+                )
+                for author in authors
+                for number in range(options['recipes'])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        following = min(options['following'], len(authors)) - 1
+        Follow.objects.bulk_create(
+            (
+                Follow(user=reader, author=author)
+                for reader in readers
+                for author in [authors[0]] + random.sample(
+                    authors[1:], following
+                )
+            ),
+            batch_size=BATCH_SIZE
+        )
+        return {
+            'author': authors[0],
+            'token': Token.objects.create(user=readers[0]).key,
+        }
+
+    def measure(self, ctx, strategy, options):
+        build = None
+        if strategy == 'write':
+            started = time.perf_counter()
+            rebuild_timelines()
+            build = time.perf_counter() - started
+
+        publish = []
+        for number in range(options['repeat']):
+            started = time.perf_counter()
+            recipe = Recipe.objects.create(
+                author=ctx['author'],
+                name=f'Новый {strategy} {number}',
+                text='Новый рецепт',
+                image='recipes/images/benchmark.png',
+                cooking_time=10
+            )
+            if strategy == 'write':
+                fan_out_recipe(recipe.pk)
+            publish.append(time.perf_counter() - started)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {ctx["token"]}')
+        path = f'/api/recipes/feed/?limit={options["limit"]}'
+        reads, queries = [], 0
+        for _ in range(options['repeat']):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(path)
+                reads.append(time.perf_counter() - started)
+            queries = max(queries, len(captured))
+        return {
+            'build': build,
+            'publish': statistics.median(publish),
+            'read': statistics.median(reads),
+            'queries': queries,
+            'status': response.status_code,
+        }
+
+    def report(self, followers, strategy, result):
+        build = (
+            f'{result["build"] * 1000:.1f}' if result['build'] is not None
+            else '-'
+        )
+        line = (
+            f'{followers:>11} {strategy:>9} {build:>10} '
+            f'{result["publish"] * 1000:>14.1f} '
+            f'{result["read"] * 1000:>10.1f} {result["queries"]:>8}'
+        )
+        if result['status'] >= 400:
+            self.stdout.write(self.style.ERROR(line))
+        else:
+            self.stdout.write(line)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import create_thumbnail
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры для рецептов, у которых их ещё нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать миниатюры для всех рецептов.'
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.all()
+        if not options['all']:
+            recipes = recipes.filter(thumbnail='')
+        created = failed = 0
+        for recipe_id in recipes.values_list('pk', flat=True).iterator():
+            try:
+                create_thumbnail(recipe_id)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'Рецепт {recipe_id}: {error}')
+            else:
+                created += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано миниатюр: {created}, ошибок: {failed}'
+        ))
@@ -0,0 +1,148 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.autocomplete import ingredient_index
+from recipes.cache import invalidate_catalogue
+from recipes.models import Ingredient
+
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) != 2:
+            continue
+        yield row[0], row[1]
+
+
+def read_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        buffer = buffer.lstrip()
+        if started:
+            buffer = buffer.lstrip(',').lstrip()
+        if not buffer:
+            chunk = file.read(JSON_CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Файл JSON обрывается до конца списка.')
+            buffer += chunk
+            continue
+        if not started:
+            if buffer[0] != '[':
+                raise CommandError('Файл JSON должен содержать список.')
+            buffer = buffer[1:]
+            started = True
+            continue
+        if buffer[0] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = file.read(JSON_CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный файл JSON.')
+            buffer += chunk
+            continue
+        buffer = buffer[end:]
+        yield (
+            item.get('name', item.get('title')),
+            item.get('measurement_unit', item.get('dimension'))
+        )
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+}
+
+
+class Command(BaseCommand):
+    help = 'Загружает справочник ингредиентов из файла CSV или JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=os.path.join(
+                settings.BASE_DIR, '..', 'data', 'ingredients.csv'
+            )
+        )
+        parser.add_argument(
+            '--format', choices=('csv', 'json'), default=None,
+            help='Формат файла. По умолчанию определяется по расширению.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Показать результат загрузки без записи в базу.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        extension = (
+            f'.{options["format"]}' if options['format']
+            else os.path.splitext(path)[1].lower()
+        )
+        if extension not in READERS:
+            raise CommandError(f'Неизвестный формат файла: {path}')
+        if not os.path.exists(path):
+            raise CommandError(f'Файл не найден: {path}')
+
+        created = skipped = processed = 0
+        with open(path, encoding='utf-8') as file:
+            rows = READERS[extension](file)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                processed += len(batch)
+                batch_created, batch_skipped = self.load_batch(
+                    batch, options
+                )
+                created += batch_created
+                skipped += batch_skipped
+                if options['verbosity']:
+                    self.stdout.write(f'Обработано строк: {processed}')
+
+        if not options['dry_run'] and created:
+            ingredient_index.invalidate()
+            invalidate_catalogue('ingredients')
+
+        prefix = 'Проверка без записи. ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Строк: {processed}, добавлено: {created}, '
+            f'пропущено: {skipped}'
+        ))
+
+    def load_batch(self, batch, options):
+        items = {}
+        skipped = 0
+        for name, measurement_unit in batch:
+            name = (name or '').strip()
+            measurement_unit = (measurement_unit or '').strip()
+            if not name or (name, measurement_unit) in items:
+                skipped += 1
+                continue
+            items[name, measurement_unit] = None
+
+        existing = set(
+            Ingredient.objects.filter(
+                name__in={name for name, measurement_unit in items}
+            ).values_list('name', 'measurement_unit')
+        )
+        new = [
+            Ingredient(name=name, measurement_unit=measurement_unit)
+            for name, measurement_unit in items
+            if (name, measurement_unit) not in existing
+        ]
+        skipped += len(items) - len(new)
+        if not options['dry_run']:
+            Ingredient.objects.bulk_create(new, ignore_conflicts=True)
+        return len(new), skipped
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.services import rebuild_cart_totals
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает итоги списков покупок по содержимому корзин. '
+        'Нужна для проверки согласованности после ручных правок базы.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_cart_totals()
+        self.stdout.write(self.style.SUCCESS(
+            f'Строк в итогах списков покупок: {created}'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from recipes.search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс рецептов.'
+
+    def handle(self, *args, **options):
+        updated = rebuild_search_vectors()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рецептов в индексе: {updated}'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.feed import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает материализованные ленты подписок. Нужна при '
+        'переключении FEED_STRATEGY на write.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_timelines()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в лентах: {created}'
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.services import recalculate_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики избранного, списков покупок и рецептов '
+        'автора по фактическим данным.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = recalculate_counters()
+        if options['verbosity']:
+            for counter, count in fixed.items():
+                self.stdout.write(f'{counter}: исправлено строк: {count}')
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
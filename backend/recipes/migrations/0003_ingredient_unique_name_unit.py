@@ -0,0 +1,56 @@
+from django.db import migrations, models
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    Ingredient = apps.get_model('recipes', 'Ingredient')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    keys = (
+        Ingredient.objects.values('name', 'measurement_unit')
+        .annotate(count=models.Count('pk'))
+        .filter(count__gt=1)
+        .values_list('name', 'measurement_unit')
+    )
+    for name, measurement_unit in keys:
+        kept, *duplicates = Ingredient.objects.filter(
+            name=name, measurement_unit=measurement_unit
+        ).order_by('pk')
+        for duplicate in duplicates:
+            items = RecipeIngredient.objects.filter(ingredient=duplicate)
+            for item in items:
+                existing = RecipeIngredient.objects.filter(
+                    recipe_id=item.recipe_id, ingredient=kept
+                ).first()
+                if existing is None:
+                    item.ingredient = kept
+                    item.save(update_fields=['ingredient'])
+                    continue
+                existing.amount += item.amount
+                existing.save(update_fields=['amount'])
+                item.delete()
+            duplicate.delete()
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ingredient',
+            name='name',
+            field=models.CharField(max_length=200, verbose_name='Название ингредиента'),
+        ),
+        migrations.RunPython(
+            merge_duplicate_ingredients,
+            migrations.RunPython.noop,
+            atomic=True
+        ),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('name', 'measurement_unit'), name='unique_ingredient_unit'),
+        ),
+    ]
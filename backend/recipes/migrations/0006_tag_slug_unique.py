@@ -0,0 +1,18 @@
+# Generated by Django 3.2.4 on 2026-10-18 19:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0005_recipe_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='slug',
+            field=models.SlugField(unique=True, verbose_name='Slug'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.4 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_tag_slug_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='thumbnail',
+            field=models.ImageField(blank=True, upload_to='recipes/thumbnails/', verbose_name='Миниатюра'),
+        ),
+    ]
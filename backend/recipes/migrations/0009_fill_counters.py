@@ -0,0 +1,37 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+COUNTERS = (
+    ('recipes', 'Recipe', 'favorites_count', 'Favorite', 'recipe'),
+    ('recipes', 'Recipe', 'in_carts_count', 'ShoppingCart', 'recipe'),
+    ('users', 'User', 'recipes_count', 'Recipe', 'author'),
+)
+
+
+def fill_counters(apps, schema_editor):
+    for app_label, model_name, counter, related_name, field in COUNTERS:
+        model = apps.get_model(app_label, model_name)
+        related_model = apps.get_model('recipes', related_name)
+        model.objects.update(**{counter: Coalesce(
+            Subquery(
+                related_model.objects.filter(**{field: OuterRef('pk')})
+                .order_by()
+                .values(field)
+                .annotate(count=Count('pk'))
+                .values('count')
+            ),
+            0
+        )})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_counters'),
+        ('users', '0002_user_recipes_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+FILL_SEARCH_VECTOR = '''
+UPDATE "recipes_recipe" SET "search_vector" =
+    setweight(to_tsvector('russian', COALESCE("name", '')), 'A') ||
+    setweight(to_tsvector('russian', COALESCE("text", '')), 'B') ||
+    setweight(to_tsvector('russian', COALESCE((
+        SELECT string_agg(ingredient."name", ' ')
+        FROM "recipes_recipeingredient" item
+        JOIN "recipes_ingredient" ingredient
+            ON ingredient."id" = item."ingredient_id"
+        WHERE item."recipe_id" = "recipes_recipe"."id"
+    ), '')), 'C')
+'''
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(FILL_SEARCH_VECTOR)
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS "recipes_recipe_search_vector_gin" '
+        'ON "recipes_recipe" USING gin ("search_vector")'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'DROP INDEX IF EXISTS "recipes_recipe_search_vector_gin"'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
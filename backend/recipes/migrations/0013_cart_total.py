@@ -0,0 +1,33 @@
+# Generated by Django 3.2.4 on 2026-10-18 20:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0012_recipe_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CartTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.PositiveIntegerField(verbose_name='Количество')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cart_totals', to='recipes.ingredient', verbose_name='Ингредиент')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cart_totals', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Итог списка покупок',
+                'verbose_name_plural': 'Итоги списков покупок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='carttotal',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='unique_cart_total'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.db.models import F, Sum
+
+
+def fill_cart_totals(apps, schema_editor):
+    CartTotal = apps.get_model('recipes', 'CartTotal')
+    RecipeIngredient = apps.get_model('recipes', 'RecipeIngredient')
+    CartTotal.objects.bulk_create(
+        (
+            CartTotal(
+                user_id=row['user_id'],
+                ingredient_id=row['ingredient_id'],
+                amount=row['amount']
+            )
+            for row in RecipeIngredient.objects.filter(
+                recipe__shopping_cart__isnull=False
+            ).values(
+                'ingredient_id', user_id=F('recipe__shopping_cart__user')
+            ).annotate(amount=Sum('amount')).order_by().iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_cart_total'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_cart_totals, migrations.RunPython.noop),
+    ]
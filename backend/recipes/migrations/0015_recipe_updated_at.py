@@ -0,0 +1,30 @@
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def fill_updated_at(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.update(updated_at=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_fill_cart_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='updated_at',
+            field=models.DateTimeField(
+                auto_now=True,
+                db_index=True,
+                default=timezone.now,
+                verbose_name='Дата изменения'
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
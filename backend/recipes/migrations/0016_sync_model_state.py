@@ -0,0 +1,50 @@
+# Generated by Django 3.2.4 on 2026-10-18 20:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0015_recipe_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipes', to=settings.AUTH_USER_MODEL, verbose_name='Автор рецепта'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='ingredients',
+            field=models.ManyToManyField(through='recipes.RecipeIngredient', to='recipes.Ingredient', verbose_name='Ингредиенты в рецепте'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='tags',
+            field=models.ManyToManyField(through='recipes.ReceiptTag', to='recipes.Tag', verbose_name='Теги рецепта'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='text',
+            field=models.TextField(max_length=2000, verbose_name='Описание рецепта'),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='color',
+            field=models.CharField(max_length=8, verbose_name='Цвет'),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='name',
+            field=models.CharField(max_length=20, unique=True, verbose_name='Название тега'),
+        ),
+        migrations.AddConstraint(
+            model_name='recipeingredient',
+            constraint=models.UniqueConstraint(fields=('recipe', 'ingredient'), name='unique_ingredient_item'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
 
@@ -8,7 +9,6 @@ User = get_user_model()
 class Ingredient(models.Model):
     name = models.CharField(
         max_length=200,
-        unique=True,
         verbose_name='Название ингредиента'
     )
     measurement_unit = models.CharField(
@@ -20,6 +20,12 @@ class Ingredient(models.Model):
         verbose_name = 'Ингредиент'
         verbose_name_plural = 'Ингредиенты'
         ordering = ['name', ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name', 'measurement_unit'],
+                name='unique_ingredient_unit'
+            )
+        ]
 
     def __str__(self):
         return f'{self.name} {self.measurement_unit}'
@@ -36,6 +42,7 @@ class Tag(models.Model):
         verbose_name='Цвет'
     )
     slug = models.SlugField(
+        unique=True,
         verbose_name='Slug'
     )
 
@@ -48,6 +55,37 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.defer('search_vector').select_related(
+            'author'
+        ).prefetch_related(
+            'tags',
+            models.Prefetch(
+                'recipeingredient_set',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
+
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self
+        return self.annotate(
+            is_favorited=models.Exists(Favorite.objects.filter(
+                user=user,
+                recipe=models.OuterRef('pk')
+            )),
+            is_in_shopping_cart=models.Exists(ShoppingCart.objects.filter(
+                user=user,
+                recipe=models.OuterRef('pk')
+            )),
+            author_is_subscribed=models.Exists(Follow.objects.filter(
+                user=user,
+                author=models.OuterRef('author')
+            ))
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -63,6 +101,11 @@ class Recipe(models.Model):
         upload_to='recipes/images/',
         verbose_name='Изображение',
     )
+    thumbnail = models.ImageField(
+        upload_to='recipes/thumbnails/',
+        blank=True,
+        verbose_name='Миниатюра',
+    )
     text = models.TextField(
         max_length=2000,
         verbose_name='Описание рецепта'
@@ -86,11 +129,43 @@ class Recipe(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном'
+    )
+    in_carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В списках покупок'
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор'
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('name', 'pub_date',)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='recipe_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.author}: {self.name}'
@@ -165,6 +240,68 @@ class Follow(models.Model):
         return f'{self.user} following {self.author}'
 
 
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Рецепт'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации'
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_timeline_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-recipe'],
+                name='timeline_user_pub_date_idx'
+            ),
+        ]
+
+
+class CartTotal(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='cart_totals',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='cart_totals',
+        verbose_name='Ингредиент'
+    )
+    amount = models.PositiveIntegerField(
+        verbose_name='Количество'
+    )
+
+    class Meta:
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_cart_total'
+            )
+        ]
+
+
 class Favorite(models.Model):
     user = models.ForeignKey(
         User,
@@ -1,5 +1,109 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    PageNumberPagination,
+    _positive_int
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPageNumberPaginator(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+def estimate_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class RecipeKeysetPaginator(BasePagination):
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param):
+            self.count = estimate_count(queryset)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            pub_date, pk = position
+            queryset = queryset.filter(pub_date__lte=pub_date).filter(
+                Q(pub_date__lt=pub_date) | Q(pk__lt=pk)
+            )
+        results = list(
+            queryset.order_by('-pub_date', '-pk')[:self.page_size + 1]
+        )
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.last = results[-1] if results else None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            value = base64.urlsafe_b64decode(encoded.encode()).decode()
+            pub_date, pk = value.rsplit('|', 1)
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def encode_cursor(self, recipe):
+        value = f'{recipe.pub_date.isoformat()}|{recipe.pk}'
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(self.last)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('next', self.get_next_link()),
+            ('previous', None),
+            ('results', data),
+        ]))
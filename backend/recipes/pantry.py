@@ -0,0 +1,126 @@
+import re
+from array import array
+from collections import defaultdict
+
+from .indexes import IncrementalIndex
+from .models import RecipeIngredient
+
+NONZERO_BYTE_RE = re.compile(rb'[^\x00]')
+
+
+def to_bitset(ids):
+    if not ids:
+        return 0
+    data = bytearray((max(ids) >> 3) + 1)
+    for pk in ids:
+        data[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(data, 'little')
+
+
+def from_bitset(bitset):
+    ids = []
+    data = bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little')
+    for match in NONZERO_BYTE_RE.finditer(data):
+        position, byte = match.start(), data[match.start()]
+        while byte:
+            low = byte & -byte
+            ids.append((position << 3) + low.bit_length() - 1)
+            byte ^= low
+    return ids
+
+
+class PantryIndex(IncrementalIndex):
+    ttl_setting = 'PANTRY_INDEX_TTL'
+
+    def load_entries(self, recipe_ids=None):
+        items = RecipeIngredient.objects.order_by()
+        if recipe_ids is not None:
+            items = items.filter(recipe_id__in=recipe_ids)
+        recipes = defaultdict(lambda: array('q'))
+        for recipe_id, ingredient_id in items.values_list(
+            'recipe_id', 'ingredient_id'
+        ).iterator():
+            recipes[recipe_id].append(ingredient_id)
+        return recipes
+
+    def build(self):
+        recipes = self.load_entries()
+        postings = defaultdict(list)
+        sizes = defaultdict(list)
+        for recipe_id, ingredients in recipes.items():
+            for ingredient_id in ingredients:
+                postings[ingredient_id].append(recipe_id)
+            sizes[len(ingredients)].append(recipe_id)
+        self._ingredients = {
+            ingredient_id: to_bitset(recipe_ids)
+            for ingredient_id, recipe_ids in postings.items()
+        }
+        self._sizes = {
+            size: to_bitset(recipe_ids)
+            for size, recipe_ids in sizes.items()
+        }
+        self._recipes = dict(recipes)
+
+    def remove_entry(self, recipe_id):
+        ingredients = self._recipes.pop(recipe_id, None)
+        if ingredients is None:
+            return
+        mask = ~(1 << recipe_id)
+        for ingredient_id in ingredients:
+            if ingredient_id in self._ingredients:
+                self._ingredients[ingredient_id] &= mask
+        size = len(ingredients)
+        if size in self._sizes:
+            self._sizes[size] &= mask
+
+    def add_entry(self, recipe_id, ingredients):
+        bit = 1 << recipe_id
+        self._recipes[recipe_id] = ingredients
+        for ingredient_id in ingredients:
+            self._ingredients[ingredient_id] = (
+                self._ingredients.get(ingredient_id, 0) | bit
+            )
+        size = len(ingredients)
+        self._sizes[size] = self._sizes.get(size, 0) | bit
+
+    def count_matches(self, ingredient_ids):
+        planes = []
+        for ingredient_id in set(ingredient_ids):
+            carry = self._ingredients.get(ingredient_id, 0)
+            for position, plane in enumerate(planes):
+                if not carry:
+                    break
+                planes[position], carry = plane ^ carry, plane & carry
+            if carry:
+                planes.append(carry)
+        return planes
+
+    def recommend(self, ingredient_ids, missing):
+        self.ensure_loaded()
+        found = []
+        with self._lock:
+            planes = self.count_matches(ingredient_ids)
+            for size, recipes in self._sizes.items():
+                for lacking in range(min(missing, size - 1) + 1):
+                    matched = size - lacking
+                    if matched >> len(planes):
+                        continue
+                    selected = recipes
+                    for position, plane in enumerate(planes):
+                        if matched >> position & 1:
+                            selected &= plane
+                        else:
+                            selected &= ~plane
+                        if not selected:
+                            break
+                    found.extend(
+                        (lacking, -matched, -recipe_id)
+                        for recipe_id in from_bitset(selected)
+                    )
+        found.sort()
+        return [
+            (-recipe_id, lacking) for lacking, matched, recipe_id in found
+        ]
+
+
+pantry_index = PantryIndex()
@@ -0,0 +1,133 @@
+import csv
+import io
+import os
+from itertools import islice
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from rest_framework import renderers
+
+PDF_FONT_NAME = 'ShoppingListFont'
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class ShoppingListRenderer(renderers.BaseRenderer):
+    charset = 'utf-8'
+    rows_per_chunk = 200
+    streaming = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b''.join(self.stream(data))
+
+    def stream(self, rows):
+        raise NotImplementedError(
+            'ShoppingListRenderer.stream() must be implemented.'
+        )
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        for chunk in chunked(rows, self.rows_per_chunk):
+            yield ''.join(
+                f'{row["name"]} - {row["amount"]} '
+                f'{row["measurement_unit"]} \n'
+                for row in chunk
+            ).encode(self.charset)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class CsvShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    header = ('Ингредиент', 'Количество', 'Единица измерения')
+
+    def stream(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.header).encode(self.charset)
+        for chunk in chunked(rows, self.rows_per_chunk):
+            yield ''.join(
+                writer.writerow(
+                    (row['name'], row['amount'], row['measurement_unit'])
+                )
+                for row in chunk
+            ).encode(self.charset)
+
+
+class PdfShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+    streaming = False
+    title = 'Список покупок'
+    truncated_message = (
+        'Ещё позиций: {count}. Полный список доступен в форматах txt и csv.'
+    )
+    font_size = 12
+    line_height = 18
+    margin = 50
+
+    def get_font_name(self):
+        if PDF_FONT_NAME in pdfmetrics.getRegisteredFontNames():
+            return PDF_FONT_NAME
+        font_path = settings.SHOPPING_LIST_PDF_FONT
+        if not os.path.exists(font_path):
+            return 'Helvetica'
+        pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, font_path))
+        return PDF_FONT_NAME
+
+    def stream(self, rows):
+        output = io.BytesIO()
+        self.draw(output, rows)
+        yield output.getvalue()
+
+    def draw(self, output, rows):
+        rows = iter(rows)
+        font_name = self.get_font_name()
+        width, height = A4
+        pdf = canvas.Canvas(output, pagesize=A4)
+        pdf.setTitle(self.title)
+        pdf.setFont(font_name, self.font_size + 4)
+        pdf.drawString(self.margin, height - self.margin, self.title)
+        y = height - self.margin - 2 * self.line_height
+        pdf.setFont(font_name, self.font_size)
+        lines = (
+            f'{number}. {row["name"]} - {row["amount"]} '
+            f'{row["measurement_unit"]}'
+            for number, row in enumerate(
+                islice(rows, settings.SHOPPING_LIST_PDF_MAX_ROWS), start=1
+            )
+        )
+        for line in lines:
+            y = self.draw_line(pdf, font_name, y, line)
+        remaining = sum(1 for row in rows)
+        if remaining:
+            self.draw_line(
+                pdf, font_name, y,
+                self.truncated_message.format(count=remaining)
+            )
+        pdf.save()
+
+    def draw_line(self, pdf, font_name, y, line):
+        if y < self.margin:
+            pdf.showPage()
+            pdf.setFont(font_name, self.font_size)
+            y = A4[1] - self.margin
+        pdf.drawString(self.margin, y, line)
+        return y - self.line_height
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import get_recipe_cache_keys
+from .models import Recipe
+from .serializers import ShowRecipeSerializer
+
+USER_FLAGS = ('is_favorited', 'is_in_shopping_cart', 'author_is_subscribed')
+
+
+def get_user_states(recipes):
+    return {
+        recipe.pk: tuple(getattr(recipe, flag) for flag in USER_FLAGS)
+        for recipe in recipes if hasattr(recipe, USER_FLAGS[0])
+    }
+
+
+def get_page_representations(page, request, thumbnails=False):
+    return get_recipe_representations(
+        [recipe.pk for recipe in page],
+        request,
+        thumbnails=thumbnails,
+        states=get_user_states(page)
+    )
+
+
+def get_recipe_representations(recipe_ids, request, thumbnails=False,
+                               states=None):
+    keys = get_recipe_cache_keys(
+        recipe_ids, 'thumbnails' if thumbnails else 'full'
+    )
+    cached = cache.get_many(keys.values())
+    data = {
+        recipe_id: cached[key]
+        for recipe_id, key in keys.items() if key in cached
+    }
+    missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in data]
+    if missing:
+        fresh = {
+            recipe.pk: ShowRecipeSerializer(
+                recipe, context={'thumbnails': thumbnails}
+            ).data
+            for recipe in Recipe.objects.with_related().filter(
+                pk__in=missing
+            )
+        }
+        cache.set_many(
+            {keys[recipe_id]: item for recipe_id, item in fresh.items()},
+            settings.RECIPE_CACHE_TIMEOUT
+        )
+        data.update(fresh)
+    items = [data[recipe_id] for recipe_id in recipe_ids if recipe_id in data]
+    if states is None:
+        states = {}
+        if request.user.is_authenticated and items:
+            states = get_user_states(
+                Recipe.objects.filter(
+                    pk__in=[item['id'] for item in items]
+                ).with_user_flags(request.user).only('id')
+            )
+    return overlay_user_state(items, request, states)
+
+
+def overlay_user_state(items, request, states):
+    results = []
+    for item in items:
+        is_favorited, is_in_shopping_cart, is_subscribed = states.get(
+            item['id'], (False, False, False)
+        )
+        item = dict(
+            item,
+            is_favorited=is_favorited,
+            is_in_shopping_cart=is_in_shopping_cart,
+            image=request.build_absolute_uri(item['image'])
+        )
+        item['author'] = dict(item['author'], is_subscribed=is_subscribed)
+        results.append(item)
+    return results
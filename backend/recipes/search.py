@@ -0,0 +1,201 @@
+import bisect
+import re
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector
+)
+from django.db import connection
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When
+)
+from django.db.models.functions import Coalesce
+
+from .indexes import IncrementalIndex
+from .models import Recipe, RecipeIngredient
+
+TOKEN_RE = re.compile(r'\w+')
+FIELD_WEIGHTS = {
+    'name': 1.0,
+    'text': 0.4,
+    'ingredients': 0.2,
+}
+
+
+def tokenize(value):
+    return TOKEN_RE.findall((value or '').lower().replace('ё', 'е'))
+
+
+class RecipeSearchIndex(IncrementalIndex):
+    ttl_setting = 'RECIPE_SEARCH_INDEX_TTL'
+
+    def load_entries(self, recipe_ids=None):
+        recipes = Recipe.objects.order_by()
+        items = RecipeIngredient.objects.order_by()
+        if recipe_ids is not None:
+            recipes = recipes.filter(pk__in=recipe_ids)
+            items = items.filter(recipe_id__in=recipe_ids)
+        documents = {
+            pk: {'name': name, 'text': text, 'ingredients': []}
+            for pk, name, text in recipes.values_list(
+                'pk', 'name', 'text'
+            ).iterator()
+        }
+        for recipe_id, name in items.values_list(
+            'recipe_id', 'ingredient__name'
+        ).iterator():
+            if recipe_id in documents:
+                documents[recipe_id]['ingredients'].append(name)
+        return documents
+
+    def build(self):
+        self._postings = defaultdict(dict)
+        self._tokens = []
+        self._documents = {}
+        for pk, document in self.load_entries().items():
+            self.add_entry(pk, document)
+
+    def add_entry(self, pk, document):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = document[field]
+            if isinstance(value, list):
+                value = ' '.join(value)
+            for token in tokenize(value):
+                weights[token] = max(weights.get(token, 0), weight)
+        for token, weight in weights.items():
+            if token not in self._postings:
+                bisect.insort(self._tokens, token)
+            self._postings[token][pk] = weight
+        self._documents[pk] = tuple(weights)
+
+    def remove_entry(self, pk):
+        for token in self._documents.pop(pk, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[token]
+                position = bisect.bisect_left(self._tokens, token)
+                del self._tokens[position]
+
+    def match(self, term):
+        found = {}
+        position = bisect.bisect_left(self._tokens, term)
+        while (position < len(self._tokens)
+               and self._tokens[position].startswith(term)):
+            for pk, weight in self._postings[self._tokens[position]].items():
+                found[pk] = max(found.get(pk, 0), weight)
+            position += 1
+        return found
+
+    def search(self, query):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        self.ensure_loaded()
+        with self._lock:
+            scores = None
+            for term in sorted(set(terms), key=len, reverse=True):
+                found = self.match(term)
+                if scores is None:
+                    scores = found
+                else:
+                    scores = {
+                        pk: score + found[pk]
+                        for pk, score in scores.items() if pk in found
+                    }
+                if not scores:
+                    return []
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))[
+            :settings.RECIPE_SEARCH_FALLBACK_LIMIT
+        ]
+
+
+recipe_index = RecipeSearchIndex()
+
+
+def get_search_vector():
+    config = settings.RECIPE_SEARCH_CONFIG
+    ingredients = Subquery(
+        RecipeIngredient.objects.filter(recipe=OuterRef('pk'))
+        .order_by()
+        .values('recipe')
+        .annotate(names=StringAgg('ingredient__name', ' '))
+        .values('names')
+    )
+    return (
+        SearchVector('name', weight='A', config=config)
+        + SearchVector('text', weight='B', config=config)
+        + SearchVector(
+            Coalesce(ingredients, Value('')), weight='C', config=config
+        )
+    )
+
+
+def update_search_vectors(recipe_ids):
+    recipe_ids = list(recipe_ids)
+    if connection.vendor != 'postgresql':
+        recipe_index.update(recipe_ids)
+        return
+    Recipe.objects.filter(pk__in=recipe_ids).update(
+        search_vector=get_search_vector()
+    )
+
+
+def update_ingredient_search_vectors(ingredient_id):
+    recipe_ids = Recipe.objects.filter(
+        recipeingredient__ingredient_id=ingredient_id
+    ).values_list('pk', flat=True).iterator()
+    while True:
+        batch = list(islice(recipe_ids, settings.RECIPE_SEARCH_BATCH_SIZE))
+        if not batch:
+            break
+        update_search_vectors(batch)
+
+
+def rebuild_search_vectors():
+    if connection.vendor != 'postgresql':
+        recipe_index.invalidate()
+        return Recipe.objects.count()
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Recipe.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:settings.RECIPE_SEARCH_BATCH_SIZE]
+        )
+        if not batch:
+            return updated
+        update_search_vectors(batch)
+        updated += len(batch)
+        last_pk = batch[-1]
+
+
+def search_recipes(queryset, query):
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(
+            query, config=settings.RECIPE_SEARCH_CONFIG
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-pub_date', '-id')
+    found = recipe_index.search(query)
+    return queryset.filter(pk__in=found).order_by(
+        Case(
+            *[When(pk=pk, then=Value(rank)) for rank, pk in enumerate(found)],
+            output_field=IntegerField()
+        )
+    )
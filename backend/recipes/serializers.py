@@ -1,11 +1,12 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from rest_framework.generics import get_object_or_404
-from django.db import IntegrityError
+from rest_framework.settings import api_settings
+from django.db import transaction
 
 from users.serializers import UserDetailSerializer
 from .fields import Base64ImageField
+from .images import create_thumbnail
 from .models import (
     Tag,
     Ingredient,
@@ -16,6 +17,12 @@ from .models import (
     Favorite,
     ShoppingCart
 )
+from .services import (add_recipes,
+                       apply_cart_totals_delta,
+                       change_counter,
+                       insert_ignoring_conflicts
+                       )
+from .tasks import enqueue
 
 User = get_user_model()
 
@@ -32,7 +39,7 @@ class ShowRecipeAddedSerializer(serializers.ModelSerializer):
 
     def get_image(self, obj):
         request = self.context.get('request')
-        photo_url = obj.image.url
+        photo_url = (obj.thumbnail or obj.image).url
         return request.build_absolute_uri(photo_url)
 
 
@@ -87,7 +94,7 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
 
 
 class AddIngredientToRecipeSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField()
 
     class Meta:
@@ -103,6 +110,7 @@ class ShowRecipeSerializer(serializers.ModelSerializer):
     ingredients = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
+    image = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -111,14 +119,25 @@ class ShowRecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time'
         )
 
+    def get_image(self, obj):
+        image = obj.image
+        if self.context.get('thumbnails') and obj.thumbnail:
+            image = obj.thumbnail
+        request = self.context.get('request')
+        if request is None:
+            return image.url
+        return request.build_absolute_uri(image.url)
+
     def get_ingredients(self, obj):
-        record = RecipeIngredient.objects.filter(recipe=obj)
+        record = obj.recipeingredient_set.all()
         return IngredientInRecipeSerializer(record, many=True).data
 
     def get_is_favorited(self, obj):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = request.user
         return Favorite.objects.filter(recipe=obj, user=user).exists()
 
@@ -126,9 +145,16 @@ class ShowRecipeSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = request.user
         return ShoppingCart.objects.filter(recipe=obj, user=user).exists()
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'author_is_subscribed'):
+            instance.author.is_subscribed = instance.author_is_subscribed
+        return super().to_representation(instance)
+
 
 class CreateRecipeSerializer(serializers.ModelSerializer):
     image = Base64ImageField(
@@ -150,29 +176,27 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
             'text', 'cooking_time'
         )
 
-    def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
-        hash_val = dict()
-        for item in ingredients:
-            if item['id'] in hash_val:
-                raise serializers.ValidationError(
-                    {
-                        'error': (
-                            'В рецепте присутствуют повторяющиеся ингредиенты'
-                        )
-                    }
-                )
-            else:
-                hash_val[item['id']] = 1
-        for item in ingredients:
-            if int(item['amount']) <= 0:
+    def validate_ingredients(self, value):
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError(
+                'В рецепте присутствуют повторяющиеся ингредиенты'
+            )
+        for item in value:
+            if item['amount'] <= 0:
                 raise serializers.ValidationError(
-                    {'ingredients': (
-                        'Количествно ингредиентов в рецепте должно быть'
-                        'больше нуля')
-                    }
+                    'Количествно ингредиентов в рецепте должно быть '
+                    'больше нуля'
                 )
-        return data
+        existing = set(
+            Ingredient.objects.filter(pk__in=ids).values_list('pk', flat=True)
+        )
+        missing = [str(pk) for pk in ids if pk not in existing]
+        if missing:
+            raise serializers.ValidationError(
+                f'Ингредиенты не существуют: {", ".join(missing)}'
+            )
+        return value
 
     def validate_cooking_time(self, data):
         if data <= 0:
@@ -181,60 +205,144 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
             )
         return data
 
+    def set_ingredients(self, recipe, ingredients, created=False):
+        wanted = {item['id']: item['amount'] for item in ingredients}
+        current = {}
+        if not created:
+            current = {
+                item.ingredient_id: item
+                for item in RecipeIngredient.objects.filter(recipe=recipe)
+            }
+        removed = current.keys() - wanted.keys()
+        deltas = {
+            ingredient_id: -current[ingredient_id].amount
+            for ingredient_id in removed
+        }
+        if removed:
+            RecipeIngredient.objects.filter(
+                recipe=recipe,
+                ingredient_id__in=removed
+            ).delete()
+        changed = []
+        for ingredient_id, amount in wanted.items():
+            item = current.get(ingredient_id)
+            if item is None:
+                deltas[ingredient_id] = amount
+            elif item.amount != amount:
+                deltas[ingredient_id] = amount - item.amount
+                item.amount = amount
+                changed.append(item)
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ['amount'])
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient_id,
+                amount=amount
+            )
+            for ingredient_id, amount in wanted.items()
+            if ingredient_id not in current
+        ])
+        return deltas
+
+    def set_tags(self, recipe, tags, created=False):
+        wanted = {tag.pk for tag in tags}
+        current = set()
+        if not created:
+            current = set(
+                ReceiptTag.objects.filter(recipe=recipe)
+                .values_list('tag_id', flat=True)
+            )
+        removed = current - wanted
+        if removed:
+            ReceiptTag.objects.filter(
+                recipe=recipe,
+                tag_id__in=removed
+            ).delete()
+        ReceiptTag.objects.bulk_create([
+            ReceiptTag(recipe=recipe, tag_id=tag_id)
+            for tag_id in wanted - current
+        ])
+
+    @transaction.atomic
     def create(self, validated_data):
         tags_data = validated_data.pop('tags')
         ingredients_data = validated_data.pop('ingredients')
         author = self.context.get('request').user
         recipe = Recipe.objects.create(author=author, **validated_data)
-        for ingredient in ingredients_data:
-            ingredient_model = ingredient['id']
-            amount = ingredient['amount']
-            RecipeIngredient.objects.create(
-                ingredient=ingredient_model,
-                recipe=recipe,
-                amount=amount
-            )
-        for tag in tags_data:
-            ReceiptTag.objects.create(recipe=recipe, tag=tag)
+        change_counter(
+            User.objects.filter(pk=author.pk), 'recipes_count', 1
+        )
+        self.set_ingredients(recipe, ingredients_data, created=True)
+        self.set_tags(recipe, tags_data, created=True)
+        enqueue(create_thumbnail, recipe.pk)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        tags_data = validated_data.pop('tags')
-        ingredient_data = validated_data.pop('ingredients')
-        ReceiptTag.objects.filter(recipe=instance).delete()
-        for tag in tags_data:
-            ReceiptTag.objects.create(
-                recipe=instance,
-                tag=tag
+        tags_data = validated_data.pop('tags', None)
+        ingredients_data = validated_data.pop('ingredients', None)
+        if tags_data is not None:
+            self.set_tags(instance, tags_data)
+        if ingredients_data is not None:
+            apply_cart_totals_delta(
+                ShoppingCart.objects.filter(
+                    recipe=instance
+                ).values_list('user_id', flat=True),
+                self.set_ingredients(instance, ingredients_data)
             )
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-        for new_ingredient in ingredient_data:
-            RecipeIngredient.objects.create(
-                ingredient=new_ingredient['id'],
-                recipe=instance,
-                amount=new_ingredient['amount']
-            )
-        instance.name = validated_data.pop('name')
-        instance.text = validated_data.pop('text')
+        for field in ('name', 'text', 'cooking_time', 'image'):
+            if validated_data.get(field) is not None:
+                setattr(instance, field, validated_data[field])
         if validated_data.get('image') is not None:
-            instance.image = validated_data.pop('image')
-        instance.cooking_time = validated_data.pop('cooking_time')
+            instance.thumbnail = ''
+            enqueue(create_thumbnail, instance.pk)
         instance.save()
         return instance
 
     def to_representation(self, instance):
+        request = self.context.get('request')
+        instance = Recipe.objects.with_related().with_user_flags(
+            request.user
+        ).get(pk=instance.pk)
         data = ShowRecipeSerializer(
             instance,
             context={
-                'request': self.context.get('request')
+                'request': request
             }
         ).data
         return data
 
 
+class RecipeIdsSerializer(serializers.Serializer):
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.BATCH_RECIPES_LIMIT
+    )
+
+
+class RecipeStateQuerySerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.RECIPE_STATE_LIMIT
+    )
+
+
+class PantrySerializer(serializers.Serializer):
+    ingredients = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.PANTRY_INGREDIENTS_LIMIT
+    )
+    missing = serializers.IntegerField(min_value=0, default=0)
+
+
 class FavoriteSerializer(serializers.ModelSerializer):
     recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
-    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    exists_message = 'Рецепт уже добавлен в избранное'
 
     class Meta:
         model = Favorite
@@ -242,27 +350,15 @@ class FavoriteSerializer(serializers.ModelSerializer):
             'user', 'recipe'
         )
 
-    def validate(self, data):
-        user = self.context.get('request').user
-        recipe_id = data['recipe'].id
-
-        if (self.context.get('request').method == 'GET'
-                and Favorite.objects.filter(user=user,
-                                            recipe__id=recipe_id).exists()):
-            raise serializers.ValidationError(
-                'Рецепт уже добавлен в избранное')
-
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-
-        if (self.context.get('request').method == 'DELETE'
-                and not Favorite.objects.filter(
-                    user=user,
-                    recipe=recipe).exists()):
-            raise serializers.ValidationError(
-                'Рецепт не добавлен в избранное'
-            )
-
-        return data
+    def create(self, validated_data):
+        instance = self.Meta.model(**validated_data)
+        if not add_recipes(
+            self.Meta.model, instance.user, [instance.recipe_id]
+        ):
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [self.exists_message]
+            })
+        return instance
 
     def to_representation(self, instance):
         request = self.context.get('request')
@@ -273,37 +369,23 @@ class FavoriteSerializer(serializers.ModelSerializer):
 
 
 class ShoppingCartSerializer(FavoriteSerializer):
+    exists_message = 'Продукты уже в корзине'
+
     class Meta(FavoriteSerializer.Meta):
         model = ShoppingCart
 
-    def validate(self, data):
-        user = self.context.get('request').user
-        recipe_id = data['recipe'].id
-        if (self.context.get('request').method == 'GET'
-                and ShoppingCart.objects.filter(
-                    user=user,
-                    recipe__id=recipe_id
-                ).exists()):
-            raise serializers.ValidationError(
-                'Продукты уже в корзине')
-
-        recipe = get_object_or_404(Recipe, id=recipe_id)
 
-        if (self.context.get('request').method == 'DELETE'
-                and not ShoppingCart.objects.filter(
-                    user=user,
-                    recipe=recipe).exists()):
-            raise serializers.ValidationError(
-                'Продукты не добавлены в корзину'
-            )
-
-        return data
+def get_recipes_limit(request):
+    try:
+        return max(int(request.query_params['recipes_limit']), 0)
+    except (KeyError, TypeError, ValueError):
+        return settings.RECIPES_LIMIT
 
 
 class ShowFollowSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField()
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta:
         model = User
@@ -317,25 +399,29 @@ class ShowFollowSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or request.user.is_anonymous:
             return False
-        return obj.follower.filter(user=obj, author=request.user).exists()
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
+        return Follow.objects.filter(user=request.user, author=obj).exists()
 
     def get_recipes(self, obj):
-        recipes = obj.recipes.all()[:settings.RECIPES_LIMIT]
         request = self.context.get('request')
+        previews = self.context.get('recipe_previews')
+        if previews is not None:
+            recipes = previews.get(obj.pk, [])
+        else:
+            recipes = obj.recipes.order_by('-pub_date', '-id')[
+                :get_recipes_limit(request)
+            ]
         context = {'request': request}
         return ShowRecipeAddedSerializer(
             recipes,
             many=True,
             context=context).data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
-
 
 class FollowSerializer(serializers.ModelSerializer):
-    queryset = User.objects.all()
-    user = serializers.PrimaryKeyRelatedField(queryset=queryset)
-    author = serializers.PrimaryKeyRelatedField(queryset=queryset)
+    user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    author = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
 
     class Meta:
         model = Follow
@@ -344,20 +430,22 @@ class FollowSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data):
-        user = self.context.get('request').user
-        author_id = data['author'].id
-        follow_exist = Follow.objects.filter(
-            user=user,
-            author__id=author_id
-        ).exists()
-
-        if self.context.get('request').method == 'GET':
-            if user.id == author_id or follow_exist:
-                raise serializers.ValidationError(
-                    'Подписка существует'
-                )
+        if data['user'].id == data['author'].id:
+            raise serializers.ValidationError(
+                'Подписка существует'
+            )
         return data
 
+    def create(self, validated_data):
+        instance = Follow(**validated_data)
+        if not insert_ignoring_conflicts(
+            Follow.objects.filter(user=instance.user), [instance], 'author'
+        ):
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: ['Подписка существует']
+            })
+        return instance
+
     def to_representation(self, instance):
         request = self.context.get('request')
         context = {'request': request}
@@ -0,0 +1,277 @@
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window
+)
+from django.db.models.functions import Coalesce, Greatest, RowNumber
+
+from .cache import invalidate_user_state
+from .models import (
+    CartTotal,
+    Favorite,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart
+)
+from .units import BASE_UNIT, UNIT_FACTOR, VOLUME_UNITS
+
+User = get_user_model()
+
+COLLECTION_COUNTERS = {
+    Favorite: 'favorites_count',
+    ShoppingCart: 'in_carts_count',
+}
+
+COUNTERS = (
+    (Recipe, 'favorites_count', Favorite, 'recipe'),
+    (Recipe, 'in_carts_count', ShoppingCart, 'recipe'),
+    (User, 'recipes_count', Recipe, 'author'),
+)
+
+
+def get_shopping_list(user):
+    return (
+        CartTotal.objects
+        .filter(user=user)
+        .annotate(measured_in_volume=Exists(CartTotal.objects.filter(
+            user=user,
+            ingredient__name=OuterRef('ingredient__name'),
+            ingredient__measurement_unit__in=VOLUME_UNITS
+        )))
+        .values(name=F('ingredient__name'), measurement_unit=BASE_UNIT)
+        .annotate(amount=Sum(F('amount') * UNIT_FACTOR))
+        .order_by('name', 'measurement_unit')
+    )
+
+
+def get_recipe_states(user, recipe_ids):
+    favorited = set(
+        Favorite.objects.filter(user=user, recipe_id__in=recipe_ids)
+        .values_list('recipe_id', flat=True)
+    )
+    in_cart = set(
+        ShoppingCart.objects.filter(user=user, recipe_id__in=recipe_ids)
+        .values_list('recipe_id', flat=True)
+    )
+    return {
+        recipe_id: {
+            'is_favorited': recipe_id in favorited,
+            'is_in_shopping_cart': recipe_id in in_cart,
+        }
+        for recipe_id in recipe_ids
+    }
+
+
+def get_recipe_amounts(recipe_ids, sign=1):
+    return {
+        ingredient_id: sign * amount
+        for ingredient_id, amount in RecipeIngredient.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by().values('ingredient_id').annotate(
+            total=Sum('amount')
+        ).values_list('ingredient_id', 'total')
+    }
+
+
+def apply_cart_totals_delta(user_ids, deltas):
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta
+    }
+    if not deltas:
+        return
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    if any(delta > 0 for delta in deltas.values()):
+        CartTotal.objects.bulk_create(
+            [
+                CartTotal(
+                    user_id=user_id, ingredient_id=ingredient_id, amount=0
+                )
+                for user_id in user_ids
+                for ingredient_id, delta in deltas.items() if delta > 0
+            ],
+            ignore_conflicts=True
+        )
+    CartTotal.objects.filter(
+        user_id__in=user_ids,
+        ingredient_id__in=deltas
+    ).update(amount=Greatest(
+        F('amount') + Case(
+            *[
+                When(ingredient_id=ingredient_id, then=Value(delta))
+                for ingredient_id, delta in deltas.items()
+            ],
+            output_field=IntegerField()
+        ),
+        0
+    ))
+    if any(delta < 0 for delta in deltas.values()):
+        CartTotal.objects.filter(
+            user_id__in=user_ids,
+            ingredient_id__in=deltas,
+            amount=0
+        ).delete()
+
+
+def insert_ignoring_conflicts(queryset, instances, field):
+    # bulk_create(ignore_conflicts=True) does not report which rows were
+    # inserted, so take them from INSERT ... RETURNING where the backend
+    # has it. Elsewhere (SQLite) a single row is inserted in a savepoint and
+    # for several rows the conflicting ones are read first in the caller's
+    # transaction: a concurrent writer then fails with "database is locked"
+    # instead of being counted as ours.
+    if not instances:
+        return []
+    meta = queryset.model._meta
+    returning_field = meta.get_field(field)
+    if connection.features.can_return_rows_from_bulk_insert:
+        rows = queryset.model._base_manager._insert(
+            instances,
+            fields=[
+                concrete_field for concrete_field in meta.concrete_fields
+                if not concrete_field.primary_key
+            ],
+            returning_fields=[returning_field],
+            ignore_conflicts=True
+        )
+        return [row[0] for row in rows if row]
+    attname = returning_field.attname
+    if len(instances) == 1:
+        try:
+            with transaction.atomic():
+                instances[0].save(force_insert=True)
+        except IntegrityError:
+            return []
+        return [getattr(instances[0], attname)]
+    values = [getattr(instance, attname) for instance in instances]
+    existing = set(queryset.filter(**{f'{attname}__in': values}).values_list(
+        attname, flat=True
+    ))
+    queryset.model.objects.bulk_create(
+        [
+            instance for instance in instances
+            if getattr(instance, attname) not in existing
+        ],
+        ignore_conflicts=True
+    )
+    return [value for value in values if value not in existing]
+
+
+def update_collection_bookkeeping(model, user, recipe_ids, sign):
+    if not recipe_ids:
+        return
+    transaction.on_commit(lambda: invalidate_user_state(user.id))
+    change_counter(
+        Recipe.objects.filter(pk__in=recipe_ids),
+        COLLECTION_COUNTERS[model],
+        sign
+    )
+    if model is ShoppingCart:
+        apply_cart_totals_delta(
+            [user.id], get_recipe_amounts(recipe_ids, sign=sign)
+        )
+
+
+def add_recipes(model, user, recipe_ids):
+    created = insert_ignoring_conflicts(
+        model.objects.filter(user=user),
+        [model(user=user, recipe_id=pk) for pk in recipe_ids],
+        'recipe'
+    )
+    update_collection_bookkeeping(model, user, created, 1)
+    return created
+
+
+def remove_recipes(model, user, recipe_ids):
+    queryset = model.objects.filter(user=user, recipe_id__in=recipe_ids)
+    if len(recipe_ids) > 1:
+        recipe_ids = list(
+            queryset.select_for_update().values_list('recipe_id', flat=True)
+        )
+        queryset = queryset.filter(recipe_id__in=recipe_ids)
+    deleted = recipe_ids if recipe_ids and queryset.delete()[0] else []
+    update_collection_bookkeeping(model, user, deleted, -1)
+    return deleted
+
+
+def rebuild_cart_totals():
+    CartTotal.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {CartTotal._meta.db_table} '
+            f'(user_id, ingredient_id, amount) '
+            f'SELECT cart.user_id, item.ingredient_id, SUM(item.amount) '
+            f'FROM {ShoppingCart._meta.db_table} cart '
+            f'JOIN {RecipeIngredient._meta.db_table} item '
+            f'ON item.recipe_id = cart.recipe_id '
+            f'GROUP BY cart.user_id, item.ingredient_id'
+        )
+        return cursor.rowcount
+
+
+def change_counter(queryset, field, delta):
+    return queryset.update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0
+    )
+
+
+def recalculate_counters():
+    fixed = {}
+    for model, counter, related_model, field in COUNTERS:
+        actual = count_related(related_model, field)
+        fixed[counter] = (
+            model.objects
+            .annotate(actual=actual)
+            .exclude(**{counter: F('actual')})
+            .update(**{counter: actual})
+        )
+    return fixed
+
+
+def get_recipe_previews(author_ids, limit):
+    previews = {author_id: [] for author_id in author_ids}
+    if not previews or limit < 1:
+        return previews
+    ranked = (
+        Recipe.objects
+        .filter(author_id__in=previews)
+        .only('id', 'author_id', 'name', 'image', 'thumbnail', 'cooking_time')
+        .annotate(preview_rank=Window(
+            expression=RowNumber(),
+            partition_by=[F('author_id')],
+            order_by=[F('pub_date').desc(), F('id').desc()]
+        ))
+        .order_by()
+    )
+    sql, params = ranked.query.sql_with_params()
+    recipes = Recipe.objects.raw(
+        f'SELECT * FROM ({sql}) ranked WHERE ranked.preview_rank <= %s '
+        f'ORDER BY ranked.author_id, ranked.preview_rank',
+        (*params, limit)
+    )
+    for recipe in recipes:
+        previews[recipe.author_id].append(recipe)
+    return previews
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .autocomplete import ingredient_index
+from .cache import invalidate_catalogue, invalidate_recipes
+from .feed import fan_out_recipe, timelines_enabled
+from .models import Ingredient, Recipe, ShoppingCart, Tag
+from .pantry import pantry_index
+from .search import (recipe_index,
+                     update_ingredient_search_vectors,
+                     update_search_vectors
+                     )
+from .services import (COLLECTION_COUNTERS,
+                       apply_cart_totals_delta,
+                       change_counter,
+                       get_recipe_amounts
+                       )
+from .tasks import enqueue
+
+AUTHOR_FIELDS = {'email', 'username', 'first_name', 'last_name'}
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def invalidate_ingredient_index(**kwargs):
+    ingredient_index.invalidate()
+    invalidate_catalogue('ingredients')
+
+
+@receiver(post_delete, sender=Ingredient)
+def invalidate_pantry_index(**kwargs):
+    pantry_index.invalidate()
+
+
+@receiver(post_save, sender=Ingredient)
+def update_ingredient_recipes_search(instance, created, **kwargs):
+    if not created:
+        enqueue(update_ingredient_search_vectors, instance.pk)
+
+
+@receiver(pre_delete, sender=Ingredient)
+def update_deleted_ingredient_recipes_search(instance, **kwargs):
+    recipe_ids = list(Recipe.objects.filter(
+        recipeingredient__ingredient=instance
+    ).values_list('pk', flat=True))
+    if recipe_ids:
+        enqueue(update_search_vectors, recipe_ids)
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tags(**kwargs):
+    invalidate_catalogue('tags')
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+def invalidate_recipe_cache(instance, **kwargs):
+    recipe_id = instance.pk
+    transaction.on_commit(lambda: invalidate_recipes([recipe_id]))
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_recipe_lists_on_create(created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: invalidate_catalogue('recipes'))
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_lists_on_delete(**kwargs):
+    transaction.on_commit(lambda: invalidate_catalogue('recipes'))
+
+
+@receiver(post_save, sender=get_user_model())
+def update_author_recipes(instance, created, update_fields, **kwargs):
+    if created or (
+        update_fields is not None
+        and not AUTHOR_FIELDS.intersection(update_fields)
+    ) or not instance.has_changed(AUTHOR_FIELDS):
+        return
+    recipes = Recipe.objects.filter(author=instance)
+    recipes.update(updated_at=timezone.now())
+    recipe_ids = list(recipes.values_list('pk', flat=True))
+    transaction.on_commit(lambda: invalidate_recipes(recipe_ids))
+
+
+@receiver(post_save, sender=Recipe)
+def fan_out_new_recipe(instance, created, **kwargs):
+    if created and timelines_enabled():
+        enqueue(fan_out_recipe, instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search(instance, **kwargs):
+    transaction.on_commit(lambda: update_search_vectors([instance.pk]))
+
+
+@receiver(post_save, sender=Recipe)
+def update_pantry_index(instance, **kwargs):
+    transaction.on_commit(lambda: pantry_index.update([instance.pk]))
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_indexes(instance, **kwargs):
+    recipe_index.remove(instance.pk)
+    pantry_index.remove(instance.pk)
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_recipe_from_cart_totals(instance, **kwargs):
+    user_ids = list(
+        ShoppingCart.objects.filter(
+            recipe=instance
+        ).values_list('user_id', flat=True)
+    )
+    if user_ids:
+        apply_cart_totals_delta(
+            user_ids, get_recipe_amounts([instance.pk], sign=-1)
+        )
+
+
+@receiver(pre_delete, sender=get_user_model())
+def remove_user_from_counters(instance, **kwargs):
+    for model, field in COLLECTION_COUNTERS.items():
+        change_counter(
+            Recipe.objects.filter(pk__in=model.objects.filter(
+                user=instance
+            ).values('recipe_id')),
+            field,
+            -1
+        )
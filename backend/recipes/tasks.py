@@ -0,0 +1,43 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.TASKS_WORKERS,
+                    thread_name_prefix='recipes-tasks'
+                )
+    return _executor
+
+
+def run_task(func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception(
+            'Фоновая задача %s завершилась ошибкой', func.__name__
+        )
+    finally:
+        connections.close_all()
+
+
+def enqueue(func, *args):
+    if settings.TASKS_BACKEND == 'sync':
+        transaction.on_commit(lambda: func(*args))
+    else:
+        transaction.on_commit(
+            lambda: get_executor().submit(run_task, func, args)
+        )
@@ -0,0 +1,108 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.autocomplete import ingredient_index
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from recipes.pantry import pantry_index
+from recipes.search import recipe_index
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def get_image(size=(1, 1), image_format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, image_format)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/{image_format.lower()};base64,{encoded}'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, TASKS_BACKEND='sync')
+class RecipesAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'ингредиент {index}', measurement_unit='г'
+            )
+            for index in range(10)
+        ]
+        cls.tag = Tag.objects.create(
+            name='Обед', color='#E26C2D', slug='lunch'
+        )
+        cls.author, cls.author_client = cls.create_user('author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        for index in (ingredient_index, pantry_index, recipe_index):
+            index.invalidate()
+
+    @classmethod
+    def create_user(cls, username):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='Pa55word!',
+            first_name=username,
+            last_name=username
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+        )
+        return user, client
+
+    def get_recipe_data(self, amounts, name='Рецепт', tags=None):
+        return {
+            'name': name,
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': get_image(),
+            'tags': [tag.pk for tag in tags or [self.tag]],
+            'ingredients': [
+                {'id': self.ingredients[index].pk, 'amount': amount}
+                for index, amount in amounts.items()
+            ],
+        }
+
+    def create_recipe(self, amounts, name='Рецепт', tags=None, client=None):
+        response = (client or self.author_client).post(
+            '/api/recipes/',
+            self.get_recipe_data(amounts, name, tags),
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return Recipe.objects.get(pk=response.json()['id'])
+
+    def update_recipe(self, recipe, amounts):
+        response = self.author_client.patch(f'/api/recipes/{recipe.pk}/', {
+            'ingredients': [
+                {'id': self.ingredients[index].pk, 'amount': amount}
+                for index, amount in amounts.items()
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+    def get_items(self, recipe):
+        return dict(
+            RecipeIngredient.objects.filter(recipe=recipe)
+            .values_list('ingredient_id', 'amount')
+        )
+
+    def get_download(self, client, query=''):
+        response = client.get(f'/api/recipes/download_shopping_cart/{query}')
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from recipes.autocomplete import ingredient_index
+from recipes.models import Ingredient
+
+
+class IngredientAutocompleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ('Сахарная пудра', 'Тростниковый сахар', 'сахар',
+                     'Ванильный сахар', 'Соль'):
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+
+    def search(self, name):
+        response = APIClient().get('/api/ingredients/', {'name': name})
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()]
+
+    def test_prefix_matches_come_first(self):
+        self.assertEqual(self.search('Сах'), [
+            'сахар',
+            'Сахарная пудра',
+            'Ванильный сахар',
+            'Тростниковый сахар',
+        ])
+
+    @override_settings(INGREDIENT_SEARCH_LIMIT=2)
+    def test_limit_is_filled_with_prefix_matches(self):
+        self.assertEqual(self.search('сахар'), ['сахар', 'Сахарная пудра'])
+
+    def test_index_follows_new_ingredients(self):
+        self.assertEqual(self.search('сол'), ['Соль'])
+        Ingredient.objects.create(name='Солод', measurement_unit='г')
+        self.assertEqual(self.search('сол'), ['Солод', 'Соль'])
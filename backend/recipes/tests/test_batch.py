@@ -0,0 +1,71 @@
+from django.conf import settings
+
+from .test_cart_totals import CartTotalsTestCase
+
+
+class BatchCollectionTests(CartTotalsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = self.create_recipe({0: 10}, 'Первый')
+        self.second = self.create_recipe({0: 5, 1: 2}, 'Второй')
+        self.missing = self.second.pk + 100
+        self.buyer, self.buyer_client = self.create_user('buyer')
+
+    def send(self, method, url, recipe_ids):
+        response = getattr(self.buyer_client, method)(
+            url, {'recipes': recipe_ids}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(item['id'], item['status']) for item in response.json()]
+
+    def test_per_id_statuses(self):
+        for collection in ('favorite', 'shopping_cart'):
+            with self.subTest(collection=collection):
+                url = f'/api/recipes/{collection}/'
+                self.buyer_client.get(
+                    f'/api/recipes/{self.first.pk}/{collection}/'
+                )
+                self.assertEqual(
+                    self.send('post', url, [
+                        self.first.pk, self.second.pk, self.missing,
+                        self.second.pk,
+                    ]),
+                    [
+                        (self.first.pk, 'exists'),
+                        (self.second.pk, 'added'),
+                        (self.missing, 'not_found'),
+                    ]
+                )
+                self.assertEqual(
+                    self.send('delete', url, [self.second.pk, self.missing]),
+                    [
+                        (self.second.pk, 'removed'),
+                        (self.missing, 'not_found'),
+                    ]
+                )
+        self.second.refresh_from_db()
+        self.assertEqual(
+            (self.second.favorites_count, self.second.in_carts_count), (0, 0)
+        )
+        self.assertEqual(
+            self.get_cart_totals(),
+            {(self.buyer.pk, self.ingredients[0].pk, 10)}
+        )
+
+    def test_invalid_payloads(self):
+        too_many = list(range(1, settings.BATCH_RECIPES_LIMIT + 2))
+        for recipe_ids in ([], too_many, ['abc'], [0]):
+            with self.subTest(recipe_ids=recipe_ids[:3]):
+                response = self.buyer_client.post(
+                    '/api/recipes/shopping_cart/',
+                    {'recipes': recipe_ids},
+                    format='json'
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_anonymous(self):
+        response = self.client.post(
+            '/api/recipes/favorite/', {'recipes': [self.first.pk]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 401)
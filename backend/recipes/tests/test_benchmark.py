@@ -0,0 +1,41 @@
+import io
+import os
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from recipes.autocomplete import ingredient_index
+from recipes.pantry import pantry_index
+from recipes.search import recipe_index
+
+INGREDIENTS_CSV = os.environ.get(
+    'INGREDIENTS_CSV',
+    os.path.join(settings.BASE_DIR, '..', 'data', 'ingredients.csv')
+)
+
+
+@skipUnless(os.path.exists(INGREDIENTS_CSV), 'Нет файла с ингредиентами')
+class BenchmarkBudgetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for index in (ingredient_index, pantry_index, recipe_index):
+            index.invalidate()
+            self.addCleanup(index.invalidate)
+
+    def test_endpoints_stay_within_budgets(self):
+        output = io.StringIO()
+        try:
+            call_command(
+                'benchmark_api',
+                users=50,
+                recipes=300,
+                ingredients=INGREDIENTS_CSV,
+                stdout=output
+            )
+        except CommandError as error:
+            self.fail(f'{error}\n{output.getvalue()}')
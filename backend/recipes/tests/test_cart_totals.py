@@ -0,0 +1,108 @@
+from recipes.models import CartTotal, Favorite, ShoppingCart
+from recipes.services import rebuild_cart_totals
+from users.models import User
+
+from .base import RecipesAPITestCase
+
+
+class CartTotalsTestCase(RecipesAPITestCase):
+    def get_cart_totals(self):
+        return set(
+            CartTotal.objects.values_list('user_id', 'ingredient_id', 'amount')
+        )
+
+
+class CartTotalTests(CartTotalsTestCase):
+    def assert_totals_match_rebuild(self):
+        totals = self.get_cart_totals()
+        rebuild_cart_totals()
+        self.assertEqual(totals, self.get_cart_totals())
+
+    def test_totals_follow_cart_and_recipe_changes(self):
+        first = self.create_recipe({0: 10, 1: 5}, 'Первый')
+        second = self.create_recipe({1: 7, 2: 3}, 'Второй')
+        buyer, client = self.create_user('buyer')
+        other, other_client = self.create_user('other')
+        client.post('/api/recipes/shopping_cart/', {
+            'recipes': [first.pk, second.pk],
+        }, format='json')
+        other_client.get(f'/api/recipes/{first.pk}/shopping_cart/')
+        self.assertIn((buyer.pk, self.ingredients[1].pk, 12),
+                      self.get_cart_totals())
+        self.assert_totals_match_rebuild()
+
+        self.update_recipe(first, {0: 20, 3: 4})
+        self.assert_totals_match_rebuild()
+
+        client.delete(f'/api/recipes/{second.pk}/shopping_cart/')
+        self.assert_totals_match_rebuild()
+
+        self.author_client.delete(f'/api/recipes/{first.pk}/')
+        self.assertEqual(self.get_cart_totals(), set())
+
+
+class CollectionAdminTests(CartTotalsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipe({0: 10, 1: 5})
+        self.buyer, client = self.create_user('buyer')
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='Pa55word!'
+        )
+        self.client.force_login(self.admin)
+
+    def get_counters(self):
+        self.recipe.refresh_from_db()
+        return self.recipe.favorites_count, self.recipe.in_carts_count
+
+    def add(self, model_name, user=None):
+        response = self.client.post(f'/admin/recipes/{model_name}/add/', {
+            'user': (user or self.buyer).pk,
+            'recipe': self.recipe.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+
+    def test_add_and_delete_keep_bookkeeping(self):
+        self.add('favorite')
+        self.add('shoppingcart')
+        self.assertEqual(self.get_counters(), (1, 1))
+        self.assertEqual(self.get_cart_totals(), {
+            (self.buyer.pk, self.ingredients[0].pk, 10),
+            (self.buyer.pk, self.ingredients[1].pk, 5),
+        })
+        for model in (Favorite, ShoppingCart):
+            item = model.objects.get()
+            response = self.client.post(
+                f'/admin/recipes/{model._meta.model_name}/{item.pk}/delete/',
+                {'post': 'yes'}
+            )
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_counters(), (0, 0))
+        self.assertFalse(CartTotal.objects.filter(amount__gt=0).exists())
+
+    def test_bulk_delete_keeps_bookkeeping(self):
+        other, client = self.create_user('other')
+        for user in (self.buyer, other):
+            self.add('shoppingcart', user)
+        self.assertEqual(self.get_counters(), (0, 2))
+        response = self.client.post('/admin/recipes/shoppingcart/', {
+            'action': 'delete_selected',
+            '_selected_action': list(
+                ShoppingCart.objects.values_list('pk', flat=True)
+            ),
+            'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(ShoppingCart.objects.exists())
+        self.assertEqual(self.get_counters(), (0, 0))
+
+    def test_items_cannot_be_edited(self):
+        self.add('favorite')
+        item = Favorite.objects.get()
+        response = self.client.post(
+            f'/admin/recipes/favorite/{item.pk}/change/',
+            {'user': self.admin.pk, 'recipe': self.recipe.pk}
+        )
+        self.assertEqual(response.status_code, 403)
+        item.refresh_from_db()
+        self.assertEqual(item.user, self.buyer)
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Tag
+
+
+class CatalogueCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(
+            name='Обед', color='#E26C2D', slug='lunch'
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='соль', measurement_unit='г'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_repeat_request_skips_database(self):
+        for url in ('/api/tags/', '/api/ingredients/'):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second.status_code, 200)
+                self.assertEqual(second.content, first.content)
+                self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_not_modified(self):
+        for url in ('/api/tags/', f'/api/tags/{self.tag.pk}/',
+                    '/api/ingredients/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('Last-Modified', response)
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_tag_changes_invalidate_cache(self):
+        etag = self.client.get('/api/tags/')['ETag']
+        self.tag.name = 'Ужин'
+        self.tag.save()
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['name'], 'Ужин')
+        self.tag.delete()
+        self.assertEqual(self.client.get('/api/tags/').json(), [])
+
+    def test_ingredient_changes_invalidate_cache(self):
+        self.client.get('/api/ingredients/')
+        Ingredient.objects.create(name='перец', measurement_unit='г')
+        names = [
+            item['name'] for item in self.client.get(
+                '/api/ingredients/'
+            ).json()
+        ]
+        self.assertEqual(sorted(names), ['перец', 'соль'])
+        self.ingredient.delete()
+        self.assertEqual(
+            [item['name'] for item in self.client.get(
+                '/api/ingredients/'
+            ).json()],
+            ['перец']
+        )
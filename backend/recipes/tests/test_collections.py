@@ -0,0 +1,78 @@
+from django.db import transaction
+
+from recipes.models import Favorite, Follow, ShoppingCart
+from recipes.services import (add_recipes,
+                              insert_ignoring_conflicts,
+                              remove_recipes
+                              )
+
+from .test_cart_totals import CartTotalsTestCase
+
+
+class CollectionWriteTests(CartTotalsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipe({0: 10})
+        self.buyer, self.buyer_client = self.create_user('buyer')
+
+    def test_duplicate_add_returns_bad_request(self):
+        for url in (f'/api/recipes/{self.recipe.pk}/favorite/',
+                    f'/api/recipes/{self.recipe.pk}/shopping_cart/',
+                    f'/api/users/{self.author.pk}/subscribe/'):
+            with self.subTest(url=url):
+                response = self.buyer_client.get(url)
+                self.assertEqual(response.status_code, 201)
+                response = self.buyer_client.get(url)
+                self.assertEqual(response.status_code, 400)
+        self.recipe.refresh_from_db()
+        self.assertEqual(
+            (self.recipe.favorites_count, self.recipe.in_carts_count), (1, 1)
+        )
+        self.assertEqual(
+            self.get_cart_totals(),
+            {(self.buyer.pk, self.ingredients[0].pk, 10)}
+        )
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_insert_reports_only_new_rows(self):
+        other = self.create_recipe({1: 1}, 'Другой')
+        Favorite.objects.create(user=self.buyer, recipe=self.recipe)
+        with transaction.atomic():
+            inserted = insert_ignoring_conflicts(
+                Favorite.objects.filter(user=self.buyer),
+                [Favorite(user=self.buyer, recipe_id=pk)
+                 for pk in (self.recipe.pk, other.pk)],
+                'recipe'
+            )
+        self.assertEqual(inserted, [other.pk])
+        self.assertEqual(
+            insert_ignoring_conflicts(Favorite.objects.all(), [], 'recipe'),
+            []
+        )
+
+    def test_add_and_remove_report_changed_recipes(self):
+        other = self.create_recipe({1: 1}, 'Другой')
+        missing = other.pk + 100
+        with transaction.atomic():
+            self.assertEqual(
+                add_recipes(ShoppingCart, self.buyer, [self.recipe.pk]),
+                [self.recipe.pk]
+            )
+            self.assertEqual(
+                add_recipes(
+                    ShoppingCart, self.buyer, [self.recipe.pk, other.pk]
+                ),
+                [other.pk]
+            )
+            self.assertEqual(
+                sorted(remove_recipes(
+                    ShoppingCart, self.buyer,
+                    [self.recipe.pk, other.pk, missing]
+                )),
+                sorted([self.recipe.pk, other.pk])
+            )
+            self.assertEqual(
+                remove_recipes(ShoppingCart, self.buyer, [self.recipe.pk]),
+                []
+            )
+        self.assertEqual(self.get_cart_totals(), set())
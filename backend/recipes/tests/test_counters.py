@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from recipes.models import Recipe, ShoppingCart
+from users.models import User
+
+from .base import RecipesAPITestCase
+
+
+class CounterTests(RecipesAPITestCase):
+    def get_counters(self, recipe):
+        recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        return (
+            recipe.favorites_count,
+            recipe.in_carts_count,
+            self.author.recipes_count,
+        )
+
+    def test_counters_follow_writes(self):
+        recipe = self.create_recipe({0: 1})
+        buyer, client = self.create_user('buyer')
+        client.get(f'/api/recipes/{recipe.pk}/favorite/')
+        client.get(f'/api/recipes/{recipe.pk}/shopping_cart/')
+        self.assertEqual(self.get_counters(recipe), (1, 1, 1))
+        client.delete(f'/api/recipes/{recipe.pk}/favorite/')
+        self.assertEqual(self.get_counters(recipe), (0, 1, 1))
+        self.author_client.delete(f'/api/recipes/{recipe.pk}/')
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 0)
+
+    def test_counters_are_decremented_when_user_is_deleted(self):
+        recipe = self.create_recipe({0: 1})
+        buyer, client = self.create_user('buyer')
+        client.get(f'/api/recipes/{recipe.pk}/favorite/')
+        client.get(f'/api/recipes/{recipe.pk}/shopping_cart/')
+        buyer.delete()
+        self.assertEqual(self.get_counters(recipe), (0, 0, 1))
+        self.assertFalse(ShoppingCart.objects.exists())
+
+    def test_recalculate_counters(self):
+        recipe = self.create_recipe({0: 1})
+        buyer, client = self.create_user('buyer')
+        client.get(f'/api/recipes/{recipe.pk}/favorite/')
+        Recipe.objects.filter(pk=recipe.pk).update(
+            favorites_count=5, in_carts_count=3
+        )
+        User.objects.filter(pk=self.author.pk).update(recipes_count=0)
+        call_command('recalculate_counters', stdout=StringIO())
+        self.assertEqual(self.get_counters(recipe), (1, 0, 1))
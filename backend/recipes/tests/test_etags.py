@@ -0,0 +1,62 @@
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Recipe
+
+from .base import RecipesAPITestCase
+
+
+class RecipeListETagTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = self.create_recipe({0: 1}, 'Старый')
+        self.new = self.create_recipe({0: 1}, 'Новый')
+
+    def assert_status(self, url, etag, status_code):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status_code)
+        return response['ETag']
+
+    def get_latest_update(self):
+        return Recipe.objects.aggregate(Max('updated_at'))['updated_at__max']
+
+    def test_not_modified_until_recipes_change(self):
+        for url in ('/api/recipes/', '/api/recipes/?pagination=keyset'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                self.assert_status(url, etag, 304)
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    created = self.create_recipe({0: 1}, 'Свежий')
+                etag = self.assert_status(url, etag, 200)
+                self.assert_status(url, etag, 304)
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.author_client.patch(
+                        f'/api/recipes/{self.old.pk}/',
+                        {'name': 'Исправленный'},
+                        format='json'
+                    )
+                etag = self.assert_status(url, etag, 200)
+
+                latest_update = self.get_latest_update()
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.author_client.delete(f'/api/recipes/{created.pk}/')
+                self.assertEqual(self.get_latest_update(), latest_update)
+                self.assert_status(url, etag, 200)
+
+    def test_revalidation_does_not_count_recipes(self):
+        etag = self.client.get('/api/recipes/')['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.assert_status('/api/recipes/', etag, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries[0]['sql'].upper())
+
+    def test_detail_etag_ignores_other_recipes(self):
+        url = f'/api/recipes/{self.new.pk}/'
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_recipe({0: 1}, 'Другой')
+            Recipe.objects.get(pk=self.old.pk).delete()
+        self.assert_status(url, etag, 304)
@@ -0,0 +1,61 @@
+from django.test import override_settings
+
+from recipes.models import TimelineEntry
+
+from .base import RecipesAPITestCase
+
+
+class FeedTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader, self.reader_client = self.create_user('reader')
+        self.followed, self.followed_client = self.create_user('followed')
+        self.other, self.other_client = self.create_user('other')
+
+    def get_feed(self):
+        response = self.reader_client.get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()['results']]
+
+    def check_feed(self):
+        self.create_recipe({0: 1}, 'Старый', client=self.followed_client)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.reader_client.get(
+                f'/api/users/{self.followed.pk}/subscribe/'
+            )
+        self.assertEqual(response.status_code, 201)
+        for name, client in (('Новый', self.followed_client),
+                             ('Чужой', self.other_client)):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_recipe({0: 1}, name, client=client)
+        self.assertEqual(self.get_feed(), ['Новый', 'Старый'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reader_client.delete(
+                f'/api/users/{self.followed.pk}/subscribe/'
+            )
+        self.assertEqual(self.get_feed(), [])
+
+    @override_settings(FEED_STRATEGY='read')
+    def test_fan_out_on_read(self):
+        self.check_feed()
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    @override_settings(FEED_STRATEGY='write')
+    def test_fan_out_on_write(self):
+        self.check_feed()
+
+    @override_settings(FEED_STRATEGY='write')
+    def test_timeline_is_filled_on_write(self):
+        self.reader_client.get(f'/api/users/{self.followed.pk}/subscribe/')
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe = self.create_recipe(
+                {0: 1}, 'Новый', client=self.followed_client
+            )
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user_id', 'recipe_id')),
+            [(self.reader.pk, recipe.pk)]
+        )
+
+    def test_anonymous_feed(self):
+        response = self.client.get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,64 @@
+from recipes.models import Tag
+
+from .base import RecipesAPITestCase
+
+
+class RecipeFilterTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.dinner = Tag.objects.create(
+            name='Ужин', color='#8775D2', slug='dinner'
+        )
+        self.both = self.create_recipe(
+            {0: 1}, 'Оба тега', tags=[self.tag, self.dinner]
+        )
+        self.lunch = self.create_recipe({0: 1}, 'Обед')
+        self.dinner_only = self.create_recipe(
+            {0: 1}, 'Ужин', tags=[self.dinner]
+        )
+        self.user, self.user_client = self.create_user('reader')
+        for recipe in (self.both, self.dinner_only):
+            self.user_client.get(f'/api/recipes/{recipe.pk}/favorite/')
+        self.user_client.get(f'/api/recipes/{self.both.pk}/shopping_cart/')
+
+    def get_names(self, query, client=None):
+        response = (client or self.user_client).get(f'/api/recipes/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['name'] for item in response.json()['results'])
+
+    def test_several_tags_do_not_duplicate_recipes(self):
+        response = self.user_client.get(
+            '/api/recipes/?tags=lunch&tags=dinner'
+        )
+        self.assertEqual(response.json()['count'], 3)
+        self.assertEqual(
+            self.get_names('tags=lunch&tags=dinner'),
+            ['Оба тега', 'Обед', 'Ужин']
+        )
+
+    def test_filters_compose(self):
+        self.assertEqual(
+            self.get_names('is_favorited=1'), ['Оба тега', 'Ужин']
+        )
+        self.assertEqual(
+            self.get_names('is_favorited=1&tags=lunch'), ['Оба тега']
+        )
+        self.assertEqual(
+            self.get_names('is_favorited=1&is_in_shopping_cart=1'),
+            ['Оба тега']
+        )
+        self.assertEqual(
+            self.get_names(
+                f'is_in_shopping_cart=1&author={self.user.pk}'
+            ),
+            []
+        )
+        self.assertEqual(
+            self.get_names(f'is_favorited=0&author={self.author.pk}'),
+            ['Оба тега', 'Обед', 'Ужин']
+        )
+
+    def test_anonymous_user_relation_filters(self):
+        self.assertEqual(
+            self.get_names('is_favorited=1', client=self.client), []
+        )
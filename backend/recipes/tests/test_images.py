@@ -0,0 +1,46 @@
+from django.test import override_settings
+from PIL import Image
+
+from recipes.models import Recipe
+
+from .base import RecipesAPITestCase, get_image
+
+
+class RecipeImageTests(RecipesAPITestCase):
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=64)
+    def test_oversized_image_is_rejected(self):
+        data = self.get_recipe_data({0: 1})
+        data['image'] = get_image(size=(200, 200))
+        response = self.author_client.post(
+            '/api/recipes/', data, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('64 байт', response.json()['image'][0])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_invalid_base64_is_rejected(self):
+        data = self.get_recipe_data({0: 1})
+        data['image'] = 'data:image/png;base64,не картинка'
+        response = self.author_client.post(
+            '/api/recipes/', data, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.json())
+
+    @override_settings(
+        RECIPE_THUMBNAIL_SIZE=(40, 40), RECIPE_THUMBNAIL_FORMAT='JPEG'
+    )
+    def test_thumbnail_is_used_in_feed(self):
+        data = self.get_recipe_data({0: 1})
+        data['image'] = get_image(size=(400, 200))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.author_client.post(
+                '/api/recipes/', data, format='json'
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+        self.assertTrue(recipe.thumbnail.name.endswith('.jpg'))
+        with Image.open(recipe.thumbnail.path) as thumbnail:
+            self.assertEqual(thumbnail.size, (40, 20))
+        feed = self.client.get('/api/recipes/').json()['results']
+        self.assertTrue(feed[0]['image'].endswith(recipe.thumbnail.url))
@@ -0,0 +1,145 @@
+import io
+import json
+import os
+import tempfile
+
+from importlib import import_module
+
+from django.apps import apps as django_apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.state import ProjectState
+from django.test import TestCase, TransactionTestCase
+
+from recipes.models import Ingredient
+
+MIGRATION = import_module(
+    'recipes.migrations.0003_ingredient_unique_name_unit'
+)
+
+
+class LoadIngredientsTests(TestCase):
+    def load(self, content, extension='.csv', **options):
+        with tempfile.NamedTemporaryFile(
+            'w', suffix=extension, encoding='utf-8', delete=False
+        ) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        output = io.StringIO()
+        call_command(
+            'load_ingredients', file.name, verbosity=0, stdout=output,
+            **options
+        )
+        return output.getvalue().strip()
+
+    def get_catalogue(self):
+        return sorted(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+
+    def test_units_are_part_of_the_key(self):
+        output = self.load(
+            'соль,г\n'
+            'пекарский порошок,г\n'
+            'пекарский порошок,ч. л.\n'
+            'соль,г\n'
+            ',г\n'
+            'битая строка\n'
+        )
+        self.assertEqual(output, 'Строк: 5, добавлено: 3, пропущено: 2')
+        self.assertEqual(self.get_catalogue(), [
+            ('пекарский порошок', 'г'),
+            ('пекарский порошок', 'ч. л.'),
+            ('соль', 'г'),
+        ])
+
+    def test_reload_skips_existing(self):
+        self.load('соль,г\n')
+        output = self.load('соль,г\nсоль,щепотка\n')
+        self.assertEqual(output, 'Строк: 2, добавлено: 1, пропущено: 1')
+        self.assertEqual(
+            self.get_catalogue(), [('соль', 'г'), ('соль', 'щепотка')]
+        )
+
+    def test_json_and_dry_run(self):
+        content = json.dumps([
+            {'name': 'мука', 'measurement_unit': 'г'},
+            {'title': 'молоко', 'dimension': 'мл'},
+        ], ensure_ascii=False)
+        output = self.load(content, '.json', dry_run=True)
+        self.assertTrue(output.startswith('Проверка без записи.'))
+        self.assertEqual(self.get_catalogue(), [])
+        self.load(content, '.json')
+        self.assertEqual(
+            self.get_catalogue(), [('молоко', 'мл'), ('мука', 'г')]
+        )
+
+
+class MergeDuplicateIngredientsTests(TransactionTestCase):
+    def setUp(self):
+        state = ProjectState.from_apps(django_apps)
+        options = state.models['recipes', 'ingredient'].options
+        constraint = next(
+            constraint for constraint in options['constraints']
+            if constraint.name == 'unique_ingredient_unit'
+        )
+        options['constraints'].remove(constraint)
+        self.apps = state.apps
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(
+                self.apps.get_model('recipes', 'Ingredient'), constraint
+            )
+        self.addCleanup(self.restore_constraint, constraint)
+
+    def restore_constraint(self, constraint):
+        Ingredient.objects.all().delete()
+        with connection.schema_editor() as editor:
+            editor.add_constraint(Ingredient, constraint)
+
+    def test_only_same_unit_duplicates_are_merged(self):
+        Ingredient = self.apps.get_model('recipes', 'Ingredient')
+        Recipe = self.apps.get_model('recipes', 'Recipe')
+        RecipeIngredient = self.apps.get_model('recipes', 'RecipeIngredient')
+        User = self.apps.get_model('users', 'User')
+        author = User.objects.create(username='author', email='a@a.ru')
+        salt, salt_copy, grams, pieces = (
+            Ingredient.objects.create(name=name, measurement_unit=unit)
+            for name, unit in (
+                ('соль', 'г'), ('соль', 'г'),
+                ('стейк', 'г'), ('стейк', 'шт.'),
+            )
+        )
+        first, second = (
+            Recipe.objects.create(
+                author=author, name=name, text='Описание',
+                cooking_time=10, image='recipes/images/recipe.png'
+            )
+            for name in ('Первый', 'Второй')
+        )
+        for recipe, ingredient, amount in (
+            (first, salt, 5), (first, salt_copy, 3), (second, salt_copy, 7),
+            (first, grams, 200), (first, pieces, 2),
+        ):
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+
+        MIGRATION.merge_duplicate_ingredients(self.apps, None)
+
+        self.assertEqual(sorted(
+            Ingredient.objects.values_list('pk', 'name', 'measurement_unit')
+        ), [
+            (salt.pk, 'соль', 'г'),
+            (grams.pk, 'стейк', 'г'),
+            (pieces.pk, 'стейк', 'шт.'),
+        ])
+        self.assertEqual(sorted(
+            RecipeIngredient.objects.values_list(
+                'recipe_id', 'ingredient_id', 'amount'
+            )
+        ), sorted([
+            (first.pk, salt.pk, 8),
+            (second.pk, salt.pk, 7),
+            (first.pk, grams.pk, 200),
+            (first.pk, pieces.pk, 2),
+        ]))
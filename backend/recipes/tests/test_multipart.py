@@ -0,0 +1,69 @@
+import io
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from recipes.models import Recipe
+
+from .base import RecipesAPITestCase
+
+
+def get_upload(size=(1, 1)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, 'PNG')
+    return SimpleUploadedFile(
+        'photo.png', buffer.getvalue(), content_type='image/png'
+    )
+
+
+class MultipartUploadTests(RecipesAPITestCase):
+    def get_form(self, image):
+        return {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': image,
+            'tags': [self.tag.pk],
+            'ingredients[0]id': self.ingredients[0].pk,
+            'ingredients[0]amount': 10,
+            'ingredients[1]id': self.ingredients[1].pk,
+            'ingredients[1]amount': 5,
+        }
+
+    def test_create_and_update_with_multipart(self):
+        response = self.author_client.post(
+            '/api/recipes/', self.get_form(get_upload()), format='multipart'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        recipe = Recipe.objects.get(pk=response.json()['id'])
+        self.assertEqual(self.get_items(recipe), {
+            self.ingredients[0].pk: 10,
+            self.ingredients[1].pk: 5,
+        })
+        self.assertTrue(recipe.image.name.endswith('.png'))
+        self.assertNotIn('photo', recipe.image.name)
+
+        image = recipe.image.name
+        response = self.author_client.patch(
+            f'/api/recipes/{recipe.pk}/',
+            {'image': get_upload(size=(2, 2))},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        recipe.refresh_from_db()
+        self.assertNotEqual(recipe.image.name, image)
+
+    def test_base64_is_still_accepted(self):
+        self.create_recipe({0: 1})
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=64)
+    def test_oversized_upload_is_rejected(self):
+        response = self.author_client.post(
+            '/api/recipes/',
+            self.get_form(get_upload(size=(200, 200))),
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.json())
+        self.assertFalse(Recipe.objects.exists())
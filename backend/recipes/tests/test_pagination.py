@@ -0,0 +1,51 @@
+from django.utils import timezone
+
+from recipes.models import Recipe
+
+from .base import RecipesAPITestCase
+
+
+class KeysetPaginationTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        pub_date = timezone.now()
+        for index in range(7):
+            recipe = Recipe.objects.create(
+                author=self.author,
+                name=f'Рецепт {index}',
+                text='Описание',
+                cooking_time=10,
+                image='recipes/images/recipe.png'
+            )
+            if index < 4:
+                Recipe.objects.filter(pk=recipe.pk).update(pub_date=pub_date)
+        self.expected = list(
+            Recipe.objects.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)
+        )
+
+    def test_cursor_walks_every_recipe_once(self):
+        found = []
+        url = '/api/recipes/?pagination=keyset&limit=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertLessEqual(len(data['results']), 3)
+            found.extend(item['id'] for item in data['results'])
+            url = data['next']
+        self.assertEqual(found, self.expected)
+
+    def test_page_number_pagination_is_default(self):
+        response = self.client.get('/api/recipes/?page=2&limit=3')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 7)
+        self.assertEqual(len(data['results']), 3)
+        self.assertNotIn('pagination=keyset', data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            '/api/recipes/?pagination=keyset&cursor=broken'
+        )
+        self.assertEqual(response.status_code, 404)
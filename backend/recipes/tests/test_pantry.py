@@ -0,0 +1,49 @@
+from recipes.pantry import from_bitset, to_bitset
+
+from .base import RecipesAPITestCase
+
+
+class PantryTests(RecipesAPITestCase):
+    def get_pantry(self, indexes, missing=0):
+        query = '&'.join(
+            f'ingredients={self.ingredients[index].pk}' for index in indexes
+        )
+        response = self.client.get(
+            f'/api/recipes/pantry/?{query}&missing={missing}'
+        )
+        self.assertEqual(response.status_code, 200)
+        return [
+            (item['name'], item['missing_ingredients'])
+            for item in response.json()['results']
+        ]
+
+    def test_bitset_round_trip(self):
+        ids = [0, 1, 7, 8, 63, 64, 1000]
+        self.assertEqual(from_bitset(to_bitset(ids)), ids)
+        self.assertEqual(from_bitset(to_bitset([])), [])
+
+    def test_recommend_by_missing_ingredients(self):
+        self.create_recipe({0: 1, 1: 1}, 'Пара')
+        self.create_recipe({0: 1, 1: 1, 2: 1}, 'Тройка')
+        self.create_recipe({3: 1, 4: 1}, 'Другое')
+        self.assertEqual(self.get_pantry([0, 1]), [('Пара', 0)])
+        self.assertEqual(
+            self.get_pantry([0, 1], missing=1), [('Пара', 0), ('Тройка', 1)]
+        )
+        self.assertEqual(self.get_pantry([5]), [])
+
+    def test_index_follows_recipe_changes(self):
+        recipe = self.create_recipe({0: 1, 1: 1}, 'Пара')
+        self.assertEqual(self.get_pantry([0, 1]), [('Пара', 0)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.update_recipe(recipe, {2: 1})
+        self.assertEqual(self.get_pantry([0, 1]), [])
+        self.assertEqual(self.get_pantry([2]), [('Пара', 0)])
+        self.author_client.delete(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(self.get_pantry([2]), [])
+
+    def test_invalid_parameters(self):
+        for query in ('', 'ingredients=x', 'ingredients=1&missing=-1'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/recipes/pantry/?{query}')
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,46 @@
+from recipes.models import ReceiptTag, RecipeIngredient, Tag
+
+from .base import RecipesAPITestCase
+
+
+class SetIngredientsTests(RecipesAPITestCase):
+    def test_update_only_touches_changed_items(self):
+        recipe = self.create_recipe({0: 10, 1: 5, 2: 3})
+        kept = RecipeIngredient.objects.get(
+            recipe=recipe, ingredient=self.ingredients[0]
+        )
+        changed = RecipeIngredient.objects.get(
+            recipe=recipe, ingredient=self.ingredients[1]
+        )
+        self.update_recipe(recipe, {0: 10, 1: 8, 4: 2})
+        self.assertEqual(self.get_items(recipe), {
+            self.ingredients[0].pk: 10,
+            self.ingredients[1].pk: 8,
+            self.ingredients[4].pk: 2,
+        })
+        self.assertTrue(RecipeIngredient.objects.filter(
+            pk=kept.pk, amount=10
+        ).exists())
+        self.assertTrue(RecipeIngredient.objects.filter(
+            pk=changed.pk, amount=8
+        ).exists())
+
+    def test_tags_are_diffed(self):
+        dinner = Tag.objects.create(
+            name='Ужин', color='#8775D2', slug='dinner'
+        )
+        recipe = self.create_recipe({0: 1})
+        kept = ReceiptTag.objects.get(recipe=recipe, tag=self.tag)
+        response = self.author_client.patch(
+            f'/api/recipes/{recipe.pk}/',
+            {'tags': [self.tag.pk, dinner.pk]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            set(ReceiptTag.objects.filter(recipe=recipe).values_list(
+                'tag_id', flat=True
+            )),
+            {self.tag.pk, dinner.pk}
+        )
+        self.assertTrue(ReceiptTag.objects.filter(pk=kept.pk).exists())
@@ -0,0 +1,69 @@
+from recipes.models import Recipe
+from users.models import User
+
+from .base import RecipesAPITestCase
+
+
+class RecipeRepresentationCacheTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipe({0: 1}, 'Суп')
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def get_detail(self, client=None):
+        response = (client or self.client).get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cached_representation_skips_database_writes(self):
+        self.get_detail()
+        Recipe.objects.filter(pk=self.recipe.pk).update(name='Не видно')
+        self.assertEqual(self.get_detail()['name'], 'Суп')
+
+    def test_edits_invalidate_cache(self):
+        self.get_detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.author_client.patch(
+                self.url, {'name': 'Борщ'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.get_detail()['name'], 'Борщ')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = 'Ужин'
+            self.tag.save()
+        self.assertEqual(self.get_detail()['tags'][0]['name'], 'Ужин')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient = self.ingredients[0]
+            ingredient.name = 'свёкла'
+            ingredient.save()
+        self.assertEqual(
+            self.get_detail()['ingredients'][0]['name'], 'свёкла'
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            author = User.objects.get(pk=self.author.pk)
+            author.first_name = 'Повар'
+            author.save()
+        self.assertEqual(self.get_detail()['author']['first_name'], 'Повар')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author_client.delete(self.url)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_user_flags_are_personal(self):
+        reader, reader_client = self.create_user('reader')
+        reader_client.get(f'/api/recipes/{self.recipe.pk}/favorite/')
+        reader_client.get(f'/api/users/{self.author.pk}/subscribe/')
+        self.get_detail()
+        data = self.get_detail(reader_client)
+        self.assertTrue(data['is_favorited'])
+        self.assertTrue(data['author']['is_subscribed'])
+        other, other_client = self.create_user('other')
+        for client in (other_client, self.client):
+            data = self.get_detail(client)
+            self.assertFalse(data['is_favorited'])
+            self.assertFalse(data['author']['is_subscribed'])
+        listed = reader_client.get('/api/recipes/').json()['results'][0]
+        self.assertTrue(listed['is_favorited'])
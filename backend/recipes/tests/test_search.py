@@ -0,0 +1,54 @@
+from recipes.models import Ingredient
+
+from .base import RecipesAPITestCase
+
+
+class RecipeSearchTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingredients[0].name = 'Тыква'
+        self.ingredients[0].save()
+
+    def create_recipe_with_text(self, name, text, amounts=None):
+        data = self.get_recipe_data(amounts or {1: 1}, name)
+        data['text'] = text
+        response = self.author_client.post(
+            '/api/recipes/', data, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+    def search(self, query):
+        response = self.client.get('/api/recipes/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.json()['results']]
+
+    def test_name_outranks_text_and_ingredients(self):
+        self.create_recipe_with_text('Суп дня', 'Ничего особенного', {0: 1})
+        self.create_recipe_with_text('Каша', 'Варить с тыквой')
+        self.create_recipe_with_text('Тыквенный пирог', 'Печь час')
+        self.assertEqual(
+            self.search('тыкв'), ['Тыквенный пирог', 'Каша', 'Суп дня']
+        )
+
+    def test_all_terms_must_match(self):
+        self.create_recipe_with_text('Тыквенный суп', 'С имбирём')
+        self.create_recipe_with_text('Тыквенный пирог', 'С корицей')
+        self.assertEqual(self.search('тыквенный имбирем'), ['Тыквенный суп'])
+        self.assertEqual(self.search('тыквенный чеснок'), [])
+
+    def test_index_follows_changes(self):
+        recipe_id = self.create_recipe_with_text('Каша', 'Овсяная')
+        self.assertEqual(self.search('тыкв'), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.author_client.patch(
+                f'/api/recipes/{recipe_id}/',
+                {'ingredients': [{'id': self.ingredients[0].pk,
+                                  'amount': 1}]},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.search('тыкв'), ['Каша'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.get(pk=self.ingredients[0].pk).delete()
+        self.assertEqual(self.search('тыкв'), [])
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.test import override_settings
+from reportlab.pdfgen import canvas
+
+from .base import RecipesAPITestCase
+
+
+class ShoppingListTests(RecipesAPITestCase):
+    def test_query_count_does_not_depend_on_cart_size(self):
+        recipes = [
+            self.create_recipe({index: 10, index + 1: 5}, f'Рецепт {index}')
+            for index in range(8)
+        ]
+        for size in (0, 1, 8):
+            with self.subTest(size=size):
+                user, client = self.create_user(f'buyer{size}')
+                if size:
+                    client.post('/api/recipes/shopping_cart/', {
+                        'recipes': [recipe.pk for recipe in recipes[:size]],
+                    }, format='json')
+                client.get('/api/users/me/')
+                with self.assertNumQueries(1):
+                    response, content = self.get_download(client)
+                self.assertEqual(
+                    len(content.decode().splitlines()), size and size + 1
+                )
+
+    def test_amounts_are_summed(self):
+        first = self.create_recipe({0: 10, 1: 5}, 'Первый')
+        second = self.create_recipe({0: 15}, 'Второй')
+        user, client = self.create_user('buyer')
+        for recipe in (first, second):
+            client.get(f'/api/recipes/{recipe.pk}/shopping_cart/')
+        response, content = self.get_download(client)
+        self.assertEqual(
+            sorted(line.strip() for line in content.decode().splitlines()),
+            ['ингредиент 0 - 25 г', 'ингредиент 1 - 5 г']
+        )
+
+    def test_anonymous_user_is_rejected(self):
+        response = self.client.get('/api/recipes/download_shopping_cart/')
+        self.assertEqual(response.status_code, 401)
+
+
+class ShoppingListFormatTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        first = self.create_recipe({0: 10, 1: 5}, 'Первый')
+        second = self.create_recipe({2: 15}, 'Второй')
+        self.user, self.buyer = self.create_user('buyer')
+        self.buyer.post('/api/recipes/shopping_cart/', {
+            'recipes': [first.pk, second.pk],
+        }, format='json')
+
+    def test_csv(self):
+        response, content = self.get_download(self.buyer, '?format=csv')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = content.decode().splitlines()
+        self.assertEqual(
+            lines[0], 'Ингредиент,Количество,Единица измерения'
+        )
+        self.assertEqual(sorted(lines[1:]), [
+            'ингредиент 0,10,г', 'ингредиент 1,5,г', 'ингредиент 2,15,г'
+        ])
+
+    def test_pdf_is_built_in_memory(self):
+        response = self.buyer.get(
+            '/api/recipes/download_shopping_cart/?format=pdf'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertIn('wishlist.pdf', response['Content-Disposition'])
+
+    @override_settings(SHOPPING_LIST_PDF_MAX_ROWS=2)
+    def test_pdf_rows_are_capped(self):
+        with mock.patch.object(
+            canvas.Canvas, 'drawString', autospec=True
+        ) as draw:
+            response = self.buyer.get(
+                '/api/recipes/download_shopping_cart/?format=pdf'
+            )
+        self.assertEqual(response.status_code, 200)
+        lines = [call.args[3] for call in draw.call_args_list]
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith('1. '))
+        self.assertTrue(lines[2].startswith('2. '))
+        self.assertIn('Ещё позиций: 1', lines[3])
@@ -0,0 +1,49 @@
+from django.conf import settings
+
+from .base import RecipesAPITestCase
+
+
+class RecipeStateTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = self.create_recipe({0: 1}, 'Первый')
+        self.second = self.create_recipe({0: 1}, 'Второй')
+        self.user, self.user_client = self.create_user('reader')
+        self.user_client.get(f'/api/recipes/{self.first.pk}/favorite/')
+        self.user_client.get(f'/api/recipes/{self.second.pk}/shopping_cart/')
+
+    def get_state(self, ids, client=None):
+        query = '&'.join(f'ids={pk}' for pk in ids)
+        return (client or self.user_client).get(
+            f'/api/recipes/state/?{query}'
+        )
+
+    def test_flags_take_two_queries(self):
+        missing = self.second.pk + 100
+        self.user_client.get('/api/users/me/')
+        with self.assertNumQueries(2):
+            response = self.get_state(
+                [self.first.pk, self.second.pk, missing, self.first.pk]
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [
+            {'id': self.first.pk,
+             'is_favorited': True, 'is_in_shopping_cart': False},
+            {'id': self.second.pk,
+             'is_favorited': False, 'is_in_shopping_cart': True},
+            {'id': missing,
+             'is_favorited': False, 'is_in_shopping_cart': False},
+        ])
+
+    def test_other_users_see_own_state(self):
+        response = self.get_state([self.first.pk], self.author_client)
+        self.assertFalse(response.json()[0]['is_favorited'])
+
+    def test_invalid_requests(self):
+        too_many = range(1, settings.RECIPE_STATE_LIMIT + 2)
+        for ids in ([], too_many, ['abc']):
+            with self.subTest(count=len(ids)):
+                self.assertEqual(self.get_state(ids).status_code, 400)
+        self.assertEqual(
+            self.get_state([self.first.pk], self.client).status_code, 401
+        )
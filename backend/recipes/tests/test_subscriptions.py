@@ -0,0 +1,63 @@
+from recipes.models import Follow, Recipe
+
+from .base import RecipesAPITestCase
+
+
+class SubscriptionsTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.reader, self.reader_client = self.create_user('reader')
+        self.authors = []
+        for index in range(6):
+            author, client = self.create_user(f'writer{index}')
+            for number in range(index):
+                self.create_recipe(
+                    {0: 1}, f'Рецепт {index}-{number}', client=client
+                )
+            self.authors.append(author)
+
+    def follow(self, authors):
+        Follow.objects.bulk_create([
+            Follow(user=self.reader, author=author) for author in authors
+        ])
+
+    def get_subscriptions(self, query=''):
+        response = self.reader_client.get(
+            f'/api/users/subscriptions/{query}'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_query_count_does_not_depend_on_followed_authors(self):
+        self.reader_client.get('/api/users/me/')
+        for authors in (self.authors[:1], self.authors[1:]):
+            with self.subTest(count=len(authors)):
+                self.follow(authors)
+                with self.assertNumQueries(3):
+                    self.get_subscriptions('?limit=10')
+
+    def test_recipes_limit(self):
+        self.follow(self.authors)
+        data = self.get_subscriptions('?recipes_limit=2&limit=10')
+        self.assertEqual(data['count'], 6)
+        for item in data['results']:
+            author = self.authors[int(item['username'][-1])]
+            expected = list(
+                Recipe.objects.filter(author=author)
+                .order_by('-pub_date', '-id')
+                .values_list('id', flat=True)[:2]
+            )
+            self.assertEqual(
+                [recipe['id'] for recipe in item['recipes']], expected
+            )
+            self.assertEqual(item['recipes_count'], author.recipes.count())
+            self.assertTrue(item['is_subscribed'])
+
+    def test_invalid_recipes_limit_falls_back_to_default(self):
+        self.follow(self.authors[-1:])
+        for query in ('?recipes_limit=abc', ''):
+            with self.subTest(query=query):
+                item = self.get_subscriptions(query)['results'][0]
+                self.assertEqual(len(item['recipes']), 5)
+        item = self.get_subscriptions('?recipes_limit=0')['results'][0]
+        self.assertEqual(item['recipes'], [])
@@ -0,0 +1,71 @@
+from recipes.models import Ingredient
+
+from .base import RecipesAPITestCase
+
+PRODUCTS = (
+    ('мука', 'г'), ('мука', 'кг'), ('мука', 'ст. л.'),
+    ('молоко', 'мл'), ('молоко', 'л'), ('молоко', 'стакан'),
+    ('сахар', 'стакан'), ('соль', 'по вкусу'),
+)
+
+
+class UnitNormalizationTests(RecipesAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.products = {
+            product: Ingredient.objects.create(
+                name=product[0], measurement_unit=product[1]
+            ).pk
+            for product in PRODUCTS
+        }
+        self.buyer, self.buyer_client = self.create_user('buyer')
+
+    def add_to_cart(self, amounts):
+        data = self.get_recipe_data({})
+        data['ingredients'] = [
+            {'id': self.products[product], 'amount': amount}
+            for product, amount in amounts.items()
+        ]
+        response = self.author_client.post(
+            '/api/recipes/', data, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.buyer_client.get(
+            f'/api/recipes/{response.json()["id"]}/shopping_cart/'
+        )
+
+    def get_lines(self):
+        response, content = self.get_download(self.buyer_client)
+        return [line.strip() for line in content.decode().splitlines()]
+
+    def test_metric_units_are_merged(self):
+        self.add_to_cart({('мука', 'г'): 100, ('мука', 'кг'): 1})
+        self.add_to_cart({('молоко', 'л'): 1, ('молоко', 'мл'): 200})
+        self.assertEqual(self.get_lines(), [
+            'молоко - 1200 мл',
+            'мука - 1100 г',
+        ])
+
+    def test_measures_are_kept_without_volume_unit(self):
+        self.add_to_cart({
+            ('мука', 'г'): 100,
+            ('мука', 'ст. л.'): 2,
+            ('сахар', 'стакан'): 1,
+            ('соль', 'по вкусу'): 1,
+        })
+        self.assertEqual(self.get_lines(), [
+            'мука - 100 г',
+            'мука - 2 ст. л.',
+            'сахар - 1 стакан',
+            'соль - 1 по вкусу',
+        ])
+
+    def test_measures_join_volume_of_same_product(self):
+        self.add_to_cart({('молоко', 'стакан'): 2, ('сахар', 'стакан'): 1})
+        self.assertEqual(
+            self.get_lines(), ['молоко - 2 стакан', 'сахар - 1 стакан']
+        )
+        self.add_to_cart({('молоко', 'мл'): 100})
+        self.assertEqual(
+            self.get_lines(), ['молоко - 500 мл', 'сахар - 1 стакан']
+        )
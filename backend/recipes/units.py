@@ -0,0 +1,52 @@
+from django.db.models import Case, CharField, F, IntegerField, Value, When
+
+VOLUME_UNIT = 'мл'
+CONVERSIONS = {
+    'кг': ('г', 1000),
+    'л': (VOLUME_UNIT, 1000),
+}
+VOLUME_MEASURES = {
+    'ч. л.': 5,
+    'ст. л.': 15,
+    'стакан': 200,
+}
+VOLUME_UNITS = [
+    unit for unit, (base, factor) in CONVERSIONS.items()
+    if base == VOLUME_UNIT
+] + [VOLUME_UNIT]
+
+
+def build_unit_expressions(field, volume_flag):
+    base_unit = Case(
+        *[
+            When(**{field: unit}, then=Value(base))
+            for unit, (base, factor) in CONVERSIONS.items()
+        ],
+        When(
+            **{f'{field}__in': list(VOLUME_MEASURES), volume_flag: True},
+            then=Value(VOLUME_UNIT)
+        ),
+        default=F(field),
+        output_field=CharField()
+    )
+    factor = Case(
+        *[
+            When(**{field: unit}, then=Value(factor))
+            for unit, (base, factor) in CONVERSIONS.items()
+        ],
+        When(**{volume_flag: True}, then=Case(
+            *[
+                When(**{field: unit}, then=Value(factor))
+                for unit, factor in VOLUME_MEASURES.items()
+            ],
+            default=Value(1)
+        )),
+        default=Value(1),
+        output_field=IntegerField()
+    )
+    return base_unit, factor
+
+
+BASE_UNIT, UNIT_FACTOR = build_unit_expressions(
+    'ingredient__measurement_unit', 'measured_in_volume'
+)
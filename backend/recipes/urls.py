@@ -2,14 +2,19 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (
+    FavoriteBatchViewSet,
     FavoriteViewSet,
     IngredientViewSet,
     RecipeViewSet,
+    ShoppingCartBatchViewSet,
     ShoppingCartViewSet,
     TagViewSet,
     ListFollowViewSet,
     FollowViewSet,
-    DownloadShoppingCart
+    DownloadShoppingCart,
+    FeedViewSet,
+    PantryViewSet,
+    RecipeStateViewSet
 )
 
 router = DefaultRouter()
@@ -25,6 +30,13 @@ urlpatterns = [
          FollowViewSet.as_view(), name='subscribe'),
     path('recipes/download_shopping_cart/',
          DownloadShoppingCart.as_view(), name='dowload_shopping_cart'),
+    path('recipes/feed/', FeedViewSet.as_view(), name='feed'),
+    path('recipes/pantry/', PantryViewSet.as_view(), name='pantry'),
+    path('recipes/state/', RecipeStateViewSet.as_view(), name='state'),
+    path('recipes/favorite/',
+         FavoriteBatchViewSet.as_view(), name='favorite_batch'),
+    path('recipes/shopping_cart/',
+         ShoppingCartBatchViewSet.as_view(), name='shopping_cart_batch'),
     path('recipes/<int:recipe_id>/favorite/',
          FavoriteViewSet.as_view(), name='favorite'),
     path('recipes/<int:recipe_id>/shopping_cart/',
@@ -1,23 +1,46 @@
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
+from django.db import transaction
+from django.db.models import BooleanField, Max, Value
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status, generics
-from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import FormParser, JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .cache import (RECIPE_LIST_CATALOGUES,
+                    CachedCatalogueMixin,
+                    get_recipes_etag,
+                    invalidate_user_state
+                    )
+from .feed import (add_author_to_timeline,
+                   get_feed,
+                   remove_author_from_timeline,
+                   timelines_enabled
+                   )
 from .filters import RecipeFilter, IngredientFilter
 from .models import (Tag,
                      Ingredient,
                      Recipe,
                      Favorite,
                      ShoppingCart,
-                     RecipeIngredient,
                      Follow
                      )
-from .paginators import CustomPageNumberPaginator
+from .paginators import CustomPageNumberPaginator, RecipeKeysetPaginator
+from .pantry import pantry_index
+from .parsers import StreamingMultiPartParser
 from .permissions import AdminOrAuthorOrReadOnly
+from .renderers import (TextShoppingListRenderer,
+                        CsvShoppingListRenderer,
+                        PdfShoppingListRenderer
+                        )
+from .representations import (get_page_representations,
+                              get_recipe_representations
+                              )
 from .serializers import (TagSerializer,
                           IngredientSerializer,
                           ShowRecipeSerializer,
@@ -25,20 +48,33 @@ from .serializers import (TagSerializer,
                           FavoriteSerializer,
                           ShoppingCartSerializer,
                           ShowFollowSerializer,
-                          FollowSerializer
+                          FollowSerializer,
+                          PantrySerializer,
+                          RecipeIdsSerializer,
+                          RecipeStateQuerySerializer,
+                          get_recipes_limit
                           )
+from .services import (add_recipes,
+                       change_counter,
+                       get_recipe_previews,
+                       get_recipe_states,
+                       get_shopping_list,
+                       remove_recipes
+                       )
 
 User = get_user_model()
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedCatalogueMixin, viewsets.ReadOnlyModelViewSet):
+    catalogue_name = 'tags'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [AllowAny, ]
     pagination_class = None
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CachedCatalogueMixin, viewsets.ReadOnlyModelViewSet):
+    catalogue_name = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = [AllowAny, ]
@@ -53,6 +89,66 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, ]
     filterset_class = RecipeFilter
     pagination_class = CustomPageNumberPaginator
+    parser_classes = [JSONParser, StreamingMultiPartParser, FormParser]
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'keyset':
+                self._paginator = RecipeKeysetPaginator()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        updated_at = queryset.order_by().aggregate(
+            updated_at=Max('updated_at')
+        )['updated_at']
+        etag, last_modified = get_recipes_etag(
+            request,
+            request.get_full_path(),
+            updated_at,
+            catalogues=RECIPE_LIST_CATALOGUES
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            page = self.paginate_queryset(
+                queryset.only('id', 'pub_date').with_user_flags(request.user)
+            )
+            response = self.get_paginated_response(
+                get_page_representations(page, request, thumbnails=True)
+            )
+        response['ETag'] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            recipe_id = int(kwargs['pk'])
+        except ValueError:
+            raise Http404
+        recipe = Recipe.objects.filter(pk=recipe_id).with_user_flags(
+            request.user
+        ).only('id', 'updated_at').first()
+        if recipe is None:
+            raise Http404
+        etag, last_modified = get_recipes_etag(
+            request, recipe_id, recipe.updated_at
+        )
+        last_modified = max(
+            last_modified, int(recipe.updated_at.timestamp())
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            data = get_page_representations([recipe], request)
+            if not data:
+                raise Http404
+            response = Response(data[0])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -61,39 +157,95 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        context.update({'request': self.request})
+        context.update({
+            'request': self.request,
+            'thumbnails': self.action == 'list',
+        })
         return context
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        author_id = instance.author_id
+        instance.delete()
+        change_counter(
+            User.objects.filter(pk=author_id), 'recipes_count', -1
+        )
+
+
+class FeedViewSet(generics.ListAPIView):
+    permission_classes = [IsAuthenticated, ]
+    serializer_class = ShowRecipeSerializer
+    pagination_class = CustomPageNumberPaginator
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(
+            get_feed(request.user).only('id', 'pub_date').with_user_flags(
+                request.user
+            )
+        )
+        return self.get_paginated_response(
+            get_page_representations(page, request, thumbnails=True)
+        )
+
+
+class PantryViewSet(generics.ListAPIView):
+    permission_classes = [AllowAny, ]
+    serializer_class = ShowRecipeSerializer
+    pagination_class = CustomPageNumberPaginator
+
+    def list(self, request, *args, **kwargs):
+        params = PantrySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ranked = pantry_index.recommend(
+            params.validated_data['ingredients'],
+            params.validated_data['missing']
+        )
+        page = dict(self.paginate_queryset(ranked))
+        data = get_recipe_representations(
+            list(page), request, thumbnails=True
+        )
+        for item in data:
+            item['missing_ingredients'] = page[item['id']]
+        return self.get_paginated_response(data)
+
+
+class RecipeStateViewSet(APIView):
+    permission_classes = [IsAuthenticated, ]
+
+    def get(self, request):
+        params = RecipeStateQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        states = get_recipe_states(
+            request.user, list(dict.fromkeys(params.validated_data['ids']))
+        )
+        return Response([
+            {'id': recipe_id, **state}
+            for recipe_id, state in states.items()
+        ])
+
 
 class FavoriteViewSet(APIView):
     permission_classes = [IsAuthenticated, ]
 
     def get(self, request, recipe_id):
-        user = request.user
-        data = {
-            'user': user.id,
-            'recipe': recipe_id,
-        }
         serializer = FavoriteSerializer(
-            data=data,
+            data={'recipe': recipe_id},
             context={
                 'request': request
             }
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
         return Response(
             serializer.data,
             status=status.HTTP_201_CREATED
         )
 
     def delete(self, request, recipe_id):
-        obj = get_object_or_404(
-            Favorite,
-            user=request.user,
-            recipe__id=recipe_id
-        )
-        obj.delete()
+        with transaction.atomic():
+            if not remove_recipes(Favorite, request.user, [recipe_id]):
+                raise Http404
         return Response(
             status=status.HTTP_204_NO_CONTENT
         )
@@ -103,69 +255,120 @@ class ShoppingCartViewSet(APIView):
     permission_classes = [IsAuthenticated, ]
 
     def get(self, request, recipe_id):
-        user = request.user
-        data = {
-            'user': user.id,
-            'recipe': recipe_id,
-        }
-
         context = {
             'request': request
         }
-        serializer = ShoppingCartSerializer(data=data, context=context)
+        serializer = ShoppingCartSerializer(
+            data={'recipe': recipe_id},
+            context=context
+        )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, recipe_id):
-        obj = get_object_or_404(
-            ShoppingCart,
-            user=request.user,
-            recipe__id=recipe_id
-        )
-        obj.delete()
+        with transaction.atomic():
+            if not remove_recipes(ShoppingCart, request.user, [recipe_id]):
+                raise Http404
         return Response(
             status=status.HTTP_204_NO_CONTENT
         )
 
 
+class BatchCollectionViewSet(APIView):
+    permission_classes = [IsAuthenticated, ]
+    model = None
+
+    def get_recipe_ids(self, request):
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return list(dict.fromkeys(serializer.validated_data['recipes']))
+
+    def post(self, request):
+        recipe_ids = self.get_recipe_ids(request)
+        found = set(
+            Recipe.objects.filter(pk__in=recipe_ids)
+            .values_list('pk', flat=True)
+        )
+        with transaction.atomic():
+            added = set(add_recipes(
+                self.model,
+                request.user,
+                [pk for pk in recipe_ids if pk in found]
+            ))
+        return Response([
+            {
+                'id': pk,
+                'status': (
+                    'added' if pk in added
+                    else 'exists' if pk in found
+                    else 'not_found'
+                )
+            }
+            for pk in recipe_ids
+        ])
+
+    def delete(self, request):
+        recipe_ids = self.get_recipe_ids(request)
+        with transaction.atomic():
+            removed = set(
+                remove_recipes(self.model, request.user, recipe_ids)
+            )
+        return Response([
+            {'id': pk, 'status': 'removed' if pk in removed else 'not_found'}
+            for pk in recipe_ids
+        ])
+
+
+class FavoriteBatchViewSet(BatchCollectionViewSet):
+    model = Favorite
+
+
+class ShoppingCartBatchViewSet(BatchCollectionViewSet):
+    model = ShoppingCart
+
+
 class DownloadShoppingCart(APIView):
     permission_classes = (IsAuthenticated,)
+    renderer_classes = (
+        TextShoppingListRenderer,
+        CsvShoppingListRenderer,
+        PdfShoppingListRenderer,
+    )
 
     def get(self, request):
-        shopping_cart = request.user.shopping_cart.all()
-        buying_list = {}
-
-        for item in shopping_cart:
-            ingredients = RecipeIngredient.objects.filter(recipe=item.recipe)
-            for ingredient in ingredients:
-                amount = ingredient.amount
-                name = ingredient.ingredient.name
-                measurement_unit = ingredient.ingredient.measurement_unit
-
-                if name not in buying_list:
-                    buying_list[name] = {
-                        'measurement_unit': measurement_unit,
-                        'amount': amount
-                    }
-                else:
-                    buying_list[name]['amount'] = (buying_list[name]['amount']
-                                                   + amount)
-
-        wishlist = []
-        for item in buying_list:
-            wishlist.append(f'{item} - {buying_list[item]["amount"]} '
-                            f'{buying_list[item]["measurement_unit"]} \n')
-
-        response = HttpResponse(wishlist, 'Content-Type: text/plain')
-        response['Content-Disposition'] = 'attachment; filename="wishlist.txt"'
+        renderer = request.accepted_renderer
+        rows = get_shopping_list(request.user).iterator()
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        if renderer.streaming:
+            response = StreamingHttpResponse(
+                renderer.stream(rows),
+                content_type=content_type
+            )
+        else:
+            response = HttpResponse(
+                b''.join(renderer.stream(rows)),
+                content_type=content_type
+            )
+        response['Content-Disposition'] = (
+            f'attachment; filename="wishlist.{renderer.format}"'
+        )
         return response
 
+    def handle_exception(self, exc):
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+        return super().handle_exception(exc)
+
 
 class ListFollowViewSet(generics.ListAPIView):
     queryset = User.objects.all()
     permission_classes = [IsAuthenticated, ]
     serializer_class = ShowFollowSerializer
+    pagination_class = CustomPageNumberPaginator
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -174,32 +377,53 @@ class ListFollowViewSet(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return User.objects.filter(following__user=user)
+        return User.objects.filter(following__user=user).annotate(
+            is_subscribed=Value(True, output_field=BooleanField())
+        ).order_by('username', 'id')
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        context['recipe_previews'] = get_recipe_previews(
+            [author.pk for author in page], get_recipes_limit(request)
+        )
+        serializer = self.get_serializer_class()(
+            page, many=True, context=context
+        )
+        return self.get_paginated_response(serializer.data)
 
 
 class FollowViewSet(APIView):
     permission_classes = [IsAuthenticated, ]
 
     def get(self, request, author_id):
-        user = request.user
-
-        data = {
-            'user': user.id,
-            'author': author_id
-        }
-        serializer = FollowSerializer(data=data, context={'request': request})
-
+        serializer = FollowSerializer(
+            data={'author': author_id},
+            context={'request': request}
+        )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            if timelines_enabled():
+                add_author_to_timeline(request.user.id, author_id)
+            transaction.on_commit(
+                lambda: invalidate_user_state(request.user.id)
+            )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, author_id):
-        obj = get_object_or_404(
-            Follow,
-            user=request.user,
-            author__id=author_id
-        )
-        obj.delete()
+        with transaction.atomic():
+            deleted, _ = Follow.objects.filter(
+                user=request.user,
+                author_id=author_id
+            ).delete()
+            if not deleted:
+                raise Http404
+            if timelines_enabled():
+                remove_author_from_timeline(request.user.id, author_id)
+            transaction.on_commit(
+                lambda: invalidate_user_state(request.user.id)
+            )
         return Response(
             status=status.HTTP_204_NO_CONTENT
         )
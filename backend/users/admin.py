@@ -5,6 +5,9 @@ from .models import User
 
 @admin.register(User)
 class User(admin.ModelAdmin):
+    list_display = (
+        'email', 'username', 'recipes_count',
+    )
     list_filter = (
         'email', 'username',
     )
@@ -0,0 +1,98 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class LocalTokenCache:
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.entries[key] = (
+                time.monotonic() + settings.AUTH_TOKEN_LOCAL_CACHE_TTL, user
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.AUTH_TOKEN_LOCAL_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+local_tokens = LocalTokenCache()
+
+
+UNCACHED_USER_FIELDS = ('password', 'recipes_count')
+
+
+def get_cache_key(key):
+    return f'auth-token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def get_cacheable_user(user):
+    fields = [
+        field.attname for field in user._meta.concrete_fields
+        if field.attname not in UNCACHED_USER_FIELDS
+    ]
+    return type(user).from_db(
+        user._state.db, fields, [getattr(user, field) for field in fields]
+    )
+
+
+def cache_token(key, user):
+    cache_key = get_cache_key(key)
+    user = get_cacheable_user(user)
+    cache.set(cache_key, user, settings.AUTH_TOKEN_CACHE_TTL)
+    local_tokens.set(cache_key, user)
+
+
+def invalidate_token(key):
+    cache_key = get_cache_key(key)
+    cache.delete(cache_key)
+    local_tokens.delete(cache_key)
+
+
+def invalidate_user_tokens(user_id):
+    for key in Token.objects.filter(user_id=user_id).values_list(
+        'key', flat=True
+    ):
+        invalidate_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache_key = get_cache_key(key)
+        user = local_tokens.get(cache_key)
+        if user is None:
+            user = cache.get(cache_key)
+            if user is None:
+                user, token = super().authenticate_credentials(key)
+                cache_token(key, user)
+                return user, token
+            local_tokens.set(cache_key, user)
+        user = copy.copy(user)
+        token = Token(key=key, user=user)
+        token._state.adding = False
+        return user, token
@@ -11,6 +11,11 @@ class User(AbstractUser):
         unique=True, blank=False,
         max_length=20
     )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов'
+    )
 
     REQUIRED_FIELDS = ['username']
     USERNAME_FIELD = 'email'
@@ -22,3 +27,27 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.email
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred
+        }
+
+    def has_changed(self, fields):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return True
+        return any(
+            field not in loaded or loaded[field] != getattr(self, field)
+            for field in fields
+        )
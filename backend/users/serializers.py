@@ -29,6 +29,8 @@ class UserDetailSerializer(UserSerializer):
         request = self.context.get('request')
         if request is None or request.user.is_anonymous:
             return False
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
         return Follow.objects.filter(user=request.user, author=obj).exists()
 
 
@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user(instance, created, **kwargs):
+    if not created:
+        invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(instance, **kwargs):
+    invalidate_token(instance.key)
@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Follow
+
+from .authentication import get_cache_key, local_tokens
+from .models import User
+
+PASSWORD = 'Pa55word!'
+
+
+def create_user(username):
+    return User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password=PASSWORD,
+        first_name=username,
+        last_name=username
+    )
+
+
+class UserListTests(TestCase):
+    def setUp(self):
+        self.user = create_user('reader')
+        self.authors = [create_user(f'author{index}') for index in range(5)]
+        Follow.objects.create(user=self.user, author=self.authors[1])
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user)}'
+        )
+
+    def test_subscription_flags_take_constant_queries(self):
+        self.client.get('/api/users/me/')
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/users/?limit=10')
+        subscribed = {
+            item['username']: item['is_subscribed']
+            for item in response.json()['results']
+        }
+        self.assertTrue(subscribed['author1'])
+        self.assertEqual(sum(subscribed.values()), 1)
+
+    def test_detail_flag(self):
+        for author, expected in ((self.authors[1], True),
+                                 (self.authors[2], False)):
+            response = self.client.get(f'/api/users/{author.pk}/')
+            self.assertIs(response.json()['is_subscribed'], expected)
+
+    def test_anonymous_list(self):
+        response = APIClient().get('/api/users/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(
+            item['is_subscribed'] for item in response.json()['results']
+        ))
+
+    def test_registration(self):
+        response = APIClient().post('/api/users/', {
+            'email': 'new@example.com',
+            'username': 'newcomer',
+            'first_name': 'Новый',
+            'last_name': 'Пользователь',
+            'password': 'N3w-Pa55word!',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertNotIn('password', response.json())
+        self.assertTrue(
+            User.objects.get(username='newcomer').check_password(
+                'N3w-Pa55word!'
+            )
+        )
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_tokens.entries.clear()
+        self.user = create_user('cook')
+        self.client = APIClient()
+        response = self.client.post('/api/auth/token/login/', {
+            'email': self.user.email,
+            'password': PASSWORD,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.key = response.json()['auth_token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.key}')
+
+    def test_login_warms_cache(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/users/me/')
+        self.assertEqual(response.json()['username'], 'cook')
+
+    def test_cached_user_has_no_password(self):
+        user = cache.get(get_cache_key(self.key))
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertIn('recipes_count', user.get_deferred_fields())
+
+    def test_user_change_invalidates_cache(self):
+        self.client.get('/api/users/me/')
+        self.user.first_name = 'Пётр'
+        self.user.save()
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.json()['first_name'], 'Пётр')
+
+    def test_deactivation_revokes_access(self):
+        self.client.get('/api/users/me/')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_set_password_invalidates_cache(self):
+        response = self.client.post('/api/users/set_password/', {
+            'current_password': PASSWORD,
+            'new_password': 'N3w-Pa55word!',
+        }, format='json')
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(cache.get(get_cache_key(self.key)))
+        self.assertIsNone(local_tokens.get(get_cache_key(self.key)))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('N3w-Pa55word!'))
+
+    def test_logout_revokes_token(self):
+        self.client.get('/api/users/me/')
+        response = self.client.post('/api/auth/token/logout/')
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get('/api/users/me/')
+        self.assertEqual(response.status_code, 401)
@@ -1,9 +1,13 @@
 from django.urls import path, include
+from rest_framework.routers import DefaultRouter
 
-from .views import CustomAuthToken, Logout
+from .views import CustomAuthToken, CustomUserViewSet, Logout
+
+router = DefaultRouter()
+router.register('users', CustomUserViewSet)
 
 urlpatterns = [
-    path('', include('djoser.urls')),
+    path('', include(router.urls)),
     path('auth/token/login/', CustomAuthToken.as_view()),
     path('auth/token/logout/', Logout.as_view())
 ]
@@ -1,15 +1,31 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
+from djoser.views import UserViewSet
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from recipes.models import Follow
+
+from .authentication import cache_token, invalidate_token
 from .serializers import AuthTokenSerializer
 
 User = get_user_model()
 
 
+class CustomUserViewSet(UserViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_anonymous:
+            return queryset
+        return queryset.annotate(is_subscribed=Exists(Follow.objects.filter(
+            user=user, author=OuterRef('pk')
+        )))
+
+
 class CustomAuthToken(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
         serializer = AuthTokenSerializer(
@@ -22,6 +38,7 @@ class CustomAuthToken(ObtainAuthToken):
         token, created = Token.objects.get_or_create(
             user=user
         )
+        cache_token(token.key, user)
         return Response(
             {
                 'auth_token': str(token)
@@ -32,7 +49,8 @@ class CustomAuthToken(ObtainAuthToken):
 
 class Logout(APIView):
     def post(self, request):
-        request.user.auth_token.delete()
+        invalidate_token(request.auth.key)
+        request.auth.delete()
         return Response(
             status=status.HTTP_204_NO_CONTENT
         )